@@ -1,39 +1,84 @@
 import streamlit as st
 import datetime
-from modules import workout, daily_log, settings, data_manager, ui
+import time
+from collections import deque
+from modules import workout, daily_log, data_manager, profiler, ui
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Life RPG", page_icon="⚔️", layout="centered")
 ui.apply_styling()
 
+# --- PLAYERS ---
+# Each household member picks their own namespace. data_manager asks for
+# the session's player on every call, including from fragments.
+SHARED_PLAYER = "🏠 Shared"
+
+def _selected_player():
+    player = st.session_state.get('player', SHARED_PLAYER)
+    return None if player == SHARED_PLAYER else player
+
+def _create_player():
+    try:
+        st.session_state['player'] = data_manager.create_user(st.session_state['new_player'].strip())
+    except ValueError as e:
+        st.session_state['player_error'] = str(e)
+
+data_manager.set_user_resolver(_selected_player)
+data_manager.enable_journal_replay()
+
 # --- SIDEBAR ---
 with st.sidebar:
     st.title("🧭 Navigation")
+
+    st.selectbox("👤 Player", [SHARED_PLAYER] + data_manager.list_users(), key="player")
+    with st.expander("➕ New player"):
+        st.text_input("Name", key="new_player")
+        st.button("Create", on_click=_create_player)
+        if 'player_error' in st.session_state:
+            st.error(st.session_state.pop('player_error'))
     
     # Date Picker (Defaults to Today)
     # This solves your "Auto reset" problem. Today is always Today.
     selected_date = st.date_input("📅 Date Control", datetime.date.today())
     
     dev_mode = st.toggle("🛠️ Developer Mode")
+    log_profile = dev_mode and st.toggle("📝 Log profile to file")
+
+# --- PROFILING (Dev Mode only) ---
+if dev_mode:
+    profiler.begin_rerun()
+    rerun_stamps = st.session_state.setdefault('profile_reruns', deque(maxlen=600))
+    rerun_stamps.append(time.time())
 
 # --- MAIN TABS ---
 # We now include a specific "Settings" tab for your customization
-tab1, tab2, tab3, tab4 = st.tabs(["📝 Daily Log", "🏋️ Workout", "📊 History", "⚙️ Settings"])
+# Switching tabs reruns the app, and only the open tab's body is executed.
+# History and Settings need pandas, so they are imported when first opened.
+tab1, tab2, tab3, tab4 = st.tabs(["📝 Daily Log", "🏋️ Workout", "📊 History", "⚙️ Settings"],
+                                 key="main_tab", on_change="rerun")
+
+with tab1, profiler.section("Daily Log"):
+    if tab1.open:
+        daily_log.render_log_tab(selected_date)
 
-with tab1:
-    daily_log.render_log_tab(selected_date)
+with tab2, profiler.section("Workout"):
+    if tab2.open:
+        workout.render_workout_tab(dev_mode)
 
-with tab2:
-    workout.render_workout_tab(dev_mode)
+with tab3, profiler.section("History"):
+    if tab3.open:
+        from modules import history
+        history.render_history_tab()
 
-with tab3:
-    st.header("📜 Your Legend")
-    df = data_manager.load_history()
-    if not df.empty:
-        st.dataframe(df.sort_values("Date", ascending=False), use_container_width=True)
-    else:
-        st.info("No history yet. Go log your first day!")
+with tab4, profiler.section("Settings"):
+    if tab4.open:
+        from modules import settings
+        settings.render_settings_tab()
 
-with tab4:
-    settings.render_settings_tab()
+if dev_mode:
+    record = profiler.end_rerun()
+    rpm = profiler.reruns_per_minute(rerun_stamps)
+    if log_profile:
+        profiler.log_record(record, {"reruns_per_min": rpm})
+    ui.show_profiler_panel(record.as_dict(), rpm, data_manager.cache_stats())
     
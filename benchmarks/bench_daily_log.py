@@ -0,0 +1,134 @@
+"""Daily Log interaction benchmark: the cost of logging one day.
+
+Logging a day means changing each Daily Log widget once and then saving.
+Two ways of running those interactions are measured through Streamlit's
+AppTest on a synthetic data folder:
+
+  full_app  every change reruns app.py (how the Daily Log worked before
+            it became a fragment, and still what a tab switch costs)
+  fragment  every change reruns only the Daily Log fragment, with the day
+            and activities loaded by the last full run
+
+For each, reports the script runs per logged day, the data_manager calls
+and CSV reads they made, and their wall time, as JSON.
+
+    python -m benchmarks.bench_daily_log --size 1y --days 5
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import statistics
+import tempfile
+from streamlit.testing.v1 import AppTest
+from benchmarks import synthetic
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+
+
+def _full_app_script():
+    import runpy
+    import streamlit as st
+    from modules import profiler
+    profiler.begin_rerun()
+    runpy.run_path(st.session_state["bench_app"], run_name="__main__")
+    st.session_state["bench_records"].append(profiler.end_rerun().as_dict())
+
+
+def _fragment_script():
+    import streamlit as st
+    from modules import daily_log, data_manager, profiler
+    date = st.session_state["bench_date"]
+    if "bench_args" not in st.session_state:
+        # What the last full run passed to the fragment
+        st.session_state["bench_args"] = (date, data_manager.get_day_data(date),
+                                          data_manager.get_activities(), None)
+    profiler.begin_rerun()
+    daily_log._log_form(*st.session_state["bench_args"])
+    st.session_state["bench_records"].append(profiler.end_rerun().as_dict())
+
+
+def _interactions(at):
+    """Changes every Daily Log widget once, then saves. Yields after each change."""
+    for i in range(len(at.checkbox)):
+        if not at.checkbox[i].disabled:
+            at.checkbox[i].check()
+            yield
+    for i in range(len(at.slider)):
+        at.slider[i].set_value(at.slider[i].max)
+        yield
+    at.number_input[0].increment()
+    yield
+    next(b for b in at.button if "SAVE" in b.label).click()
+    yield
+
+
+def log_day(script, date):
+    """Logs one day with the given script. Returns the per-run records."""
+    at = AppTest.from_function(script, default_timeout=60)
+    at.session_state["bench_app"] = APP_PATH
+    at.session_state["bench_date"] = date
+    at.session_state["bench_records"] = []
+    at.run()
+    if script is _full_app_script:
+        # The app takes its date from the sidebar
+        at.sidebar.date_input[0].set_value(date)
+        at.run()
+    first = len(at.session_state["bench_records"])
+    for _ in _interactions(at):
+        at.run()
+    if at.exception:
+        raise SystemExit(f"{script.__name__}: {at.exception[0].value}")
+    return at.session_state["bench_records"][first:]
+
+
+@contextlib.contextmanager
+def _in_folder(folder):
+    from modules import data_manager
+    old = os.getcwd()
+    os.chdir(folder)
+    data_manager.reset_caches()
+    try:
+        yield
+    finally:
+        os.chdir(old)
+        data_manager.reset_caches()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="1y", choices=list(synthetic.SIZES))
+    parser.add_argument("--days", type=int, default=5, help="days logged per mode")
+    args = parser.parse_args()
+
+    n_days, n_sets = synthetic.SIZES[args.size]
+    report = {"size": args.size, "days_logged": args.days}
+    for label, script in (("full_app", _full_app_script), ("fragment", _fragment_script)):
+        with tempfile.TemporaryDirectory() as folder, _in_folder(folder):
+            synthetic.write_dataset(folder, n_days, n_sets)
+            days = []
+            for k in range(args.days):
+                date = datetime.date.today() - datetime.timedelta(days=k)
+                records = log_day(script, date)
+                days.append({
+                    "runs": len(records),
+                    "calls": sum(c["count"] for r in records for c in r["calls"].values()),
+                    "csv_reads": sum(r["csv_reads"] for r in records),
+                    "ms": sum(r["total_ms"] for r in records),
+                    "ms_per_run": [r["total_ms"] for r in records],
+                })
+        report[label] = {
+            "script_runs_per_day": days[0]["runs"],
+            "full_app_reruns_per_day": days[0]["runs"] if label == "full_app" else 0,
+            "data_manager_calls_per_day": statistics.median(d["calls"] for d in days),
+            "csv_reads_per_day": statistics.median(d["csv_reads"] for d in days),
+            "ms_per_day": round(statistics.median(d["ms"] for d in days), 1),
+            "ms_per_change_p50": round(statistics.median(ms for d in days for ms in d["ms_per_run"][:-1]), 2),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
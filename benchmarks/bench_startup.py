@@ -0,0 +1,76 @@
+"""Cold-start benchmark: time to first render of the Daily Log.
+
+Each sample runs in a fresh Python process (so no module is already
+imported), renders the app once through Streamlit's AppTest in a
+synthetic data folder, then saves the day. Reports the timings and
+whether pandas/numpy were imported along the way, as JSON.
+
+    python -m benchmarks.bench_startup --size 1y --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from benchmarks import synthetic
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+
+# Runs inside the child process, from the data folder
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_import = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+at.run()
+t_render = time.perf_counter()
+pandas_on_render = "pandas" in sys.modules
+next(b for b in at.button if "SAVE" in b.label).click()
+at.run()
+t_save = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t_import - t0) * 1e3,
+    "first_render_ms": (t_render - t_import) * 1e3,
+    "save_ms": (t_save - t_render) * 1e3,
+    "pandas_on_render": pandas_on_render,
+    "pandas_after_save": "pandas" in sys.modules,
+    "numpy_after_save": "numpy" in sys.modules,
+    "errors": [str(e.value) for e in at.exception],
+}))
+"""
+
+
+def run_once(folder):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    out = subprocess.run([sys.executable, "-c", _CHILD, APP_PATH], cwd=folder, env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="1y", choices=list(synthetic.SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    days, sets = synthetic.SIZES[args.size]
+    with tempfile.TemporaryDirectory() as folder:
+        synthetic.write_dataset(folder, days, sets)
+        samples = [run_once(folder) for _ in range(args.repeat)]
+
+    report = {"size": args.size, "runs": args.repeat}
+    for key in ("import_ms", "first_render_ms", "save_ms"):
+        values = [s[key] for s in samples]
+        report[key] = {"median": round(statistics.median(values), 1), "min": round(min(values), 1)}
+    for key in ("pandas_on_render", "pandas_after_save", "numpy_after_save"):
+        report[key] = any(s[key] for s in samples)
+    report["errors"] = sorted({e for s in samples for e in s["errors"]})
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Scaling benchmarks for data_manager and full app reruns.
+
+Generates synthetic data at each named size, times every data_manager
+entry point (cold = caches dropped first, warm = repeated calls) and
+full-script reruns of each tab through Streamlit's AppTest, then prints
+JSON.
+
+    python -m benchmarks.bench_suite --sizes 1y 10y --out bench.json
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import pandas as pd
+from benchmarks import synthetic
+from modules import data_manager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+TABS = {"daily_log": "📝 Daily Log", "workout": "🏋️ Workout", "history": "📊 History", "settings": "⚙️ Settings"}
+
+
+@contextlib.contextmanager
+def _in_folder(folder):
+    old = os.getcwd()
+    os.chdir(folder)
+    data_manager.reset_caches()
+    try:
+        yield
+    finally:
+        os.chdir(old)
+        data_manager.reset_caches()
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return {"median_ms": round(statistics.median(samples) * 1e3, 3),
+            "min_ms": round(min(samples) * 1e3, 3),
+            "runs": repeat}
+
+
+def _cold(fn):
+    def run():
+        data_manager.reset_caches()
+        fn()
+    return run
+
+
+def _workout_flush():
+    """A base routine's worth of sets: 12 journal appends, then one flush."""
+    for _ in range(12):
+        data_manager.log_set("Push-ups", 12)
+    data_manager.flush_sets()
+
+
+def _history_memory():
+    """Bytes held by the history frame: as read_csv infers it vs the compact schema."""
+    inferred = pd.read_csv(data_manager.DATA_FILE)
+    return {"inferred": int(inferred.memory_usage(deep=True).sum()),
+            "typed": int(data_manager.load_history().memory_usage(deep=True).sum())}
+
+
+def _parse_csv():
+    """A cold load that can't use the .npy cache."""
+    from modules import compact
+    compact.typed(pd.read_csv(data_manager.DATA_FILE, dtype={"Custom_Mask": "Int64"}))
+
+
+def bench_data_manager(repeat):
+    today = datetime.date.today()
+    some_day = today - datetime.timedelta(days=100)
+    row = {"Points": 100, "Steps": 5000, "Sleep_Hours": 8.0, "Wake_Mood": "Normal",
+           "Workout_Done": True, "Food_Bonus": 10, "Study_Mins": 30, "Custom_Notes": "",
+           "Custom_Activities": "[]", "Custom_Mask": 0}
+    calls = {
+        "load_history": lambda: data_manager.load_history(),
+        "get_day_data": lambda: data_manager.get_day_data(some_day),
+        "get_target_reps": lambda: data_manager.get_target_reps("Push-ups"),
+        "get_session_reps": lambda: data_manager.get_session_reps(today.isoformat()),
+        "get_last_workout_date": lambda: data_manager.get_last_workout_date(),
+    }
+    results = {}
+    for name, fn in calls.items():
+        results[name] = {"cold": _time(_cold(fn), repeat), "warm": _time(fn, repeat)}
+    results["load_history_csv_parse"] = {"cold": _time(_parse_csv, repeat)}
+    results["history_bytes"] = _history_memory()
+    results["save_day"] = {"warm": _time(lambda: data_manager.save_day(some_day, dict(row)), repeat)}
+    results["save_reps"] = {"warm": _time(lambda: data_manager.save_reps("Push-ups", 12), repeat)}
+    results["log_set"] = {"warm": _time(lambda: data_manager.log_set("Push-ups", 12), repeat)}
+    results["flush_sets_12"] = {"warm": _time(_workout_flush, repeat)}
+    return results
+
+
+def bench_app(repeat):
+    """Full-script reruns of the app, per tab (only the open tab renders)."""
+    from streamlit.testing.v1 import AppTest
+
+    def fresh():
+        return AppTest.from_file(APP_PATH, default_timeout=120)
+
+    def first_run():
+        fresh().run()
+
+    def fresh_tab(label):
+        # A widget's state can only be seeded before its first run, so each
+        # tab gets its own session, opened on that tab
+        at = fresh()
+        at.session_state["main_tab"] = label
+        return at.run()
+
+    results = {"first_run": _time(first_run, repeat)}
+    for name, label in TABS.items():
+        at = fresh_tab(label)
+        results[f"rerun_{name}"] = _time(at.run, repeat)
+
+    at = fresh_tab(TABS["daily_log"])
+
+    def toggle_habit():
+        box = next(c for c in at.checkbox if c.label.startswith("Walk Dogs"))
+        box.set_value(not box.value).run()
+
+    results["daily_log_toggle"] = _time(toggle_habit, repeat)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=list(synthetic.SIZES), choices=list(synthetic.SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-app", action="store_true", help="only time data_manager calls")
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "backend": data_manager.BACKEND,
+        "sizes": {},
+    }
+    for size in args.sizes:
+        days, sets = synthetic.SIZES[size]
+        with tempfile.TemporaryDirectory() as folder:
+            synthetic.write_dataset(folder, days, sets)
+            with _in_folder(folder):
+                entry = {"days": days, "sets": sets, "data_manager": bench_data_manager(args.repeat)}
+                if not args.skip_app:
+                    entry["app"] = bench_app(args.repeat)
+            report["sizes"][size] = entry
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
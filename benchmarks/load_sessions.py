@@ -0,0 +1,201 @@
+"""Concurrent-session load test: how many users one server handles.
+
+Drives N headless sessions of the app through Streamlit's AppTest on a
+synthetic data folder, each playing one role in a loop:
+
+  log       ticks a habit on the Daily Log and saves, every 3 s
+  workout   runs the base workout, rerunning once a second while a
+            timer is on screen (AppTest can only rerun the whole script,
+            so this is an upper bound on the countdown fragment's cost)
+  history   reopens the History tab every 5 s
+
+Sessions are threads of one server process (--procs spreads them over
+several). AppTest keeps one runtime per process, so a process runs one
+script at a time, much as the GIL would; the time a rerun waits for its
+turn is part of its latency. For each session count, reports p50/p95
+rerun latency overall and per role, memory per session (peak RSS growth
+over an idle server, divided by its sessions) and the CPU time used.
+
+    python -m benchmarks.load_sessions --sessions 1 4 16 --duration 20
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from benchmarks import synthetic
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+
+TABS = {"log": "📝 Daily Log", "workout": "🏋️ Workout", "history": "📊 History"}
+THINK_SECONDS = {"log": 3.0, "workout": 1.0, "history": 5.0}
+TIMER_TICKS = 3  # reruns an exercise or rest timer stays on screen before it is skipped
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def _button(at, text):
+    return next(b for b in at.button if text in b.label)
+
+
+class Session:
+    """One simulated browser tab."""
+
+    def __init__(self, role, run_lock):
+        from streamlit.testing.v1 import AppTest
+        self.role = role
+        self.at = AppTest.from_file(APP_PATH, default_timeout=120)
+        self.run_lock = run_lock
+        self.latencies = []
+        self.errors = []
+        self.ticks = 0
+
+    def run(self):
+        """One rerun of the app in this session's tab."""
+        t0 = time.perf_counter()
+        with self.run_lock:
+            self.at.session_state["main_tab"] = TABS[self.role]
+            self.at.run()
+        self.latencies.append(time.perf_counter() - t0)
+        if self.at.exception:
+            self.errors.append(str(self.at.exception[0].value))
+
+    def step(self):
+        """The next user action for this role."""
+        if self.role == "log":
+            box = next((c for c in self.at.checkbox if not c.value and "(+" in c.label), None)
+            if box is not None:
+                box.check()
+                self.run()
+            _button(self.at, "SAVE").click()
+        elif self.role == "workout":
+            self._workout_step()
+        self.run()
+
+    def _workout_step(self):
+        state = self.at.session_state
+        stage = state["wo_stage"] if "wo_stage" in state else "prep"
+        if stage == "prep":
+            _button(self.at, "START BASE WORKOUT").click()
+        elif stage == "ready":
+            _button(self.at, "START EXERCISE").click()
+        elif stage in ("active", "rest"):
+            # The countdown ticks once a second; skip ahead after a few ticks
+            self.ticks += 1
+            if self.ticks >= TIMER_TICKS:
+                self.ticks = 0
+                _button(self.at, "Done" if stage == "active" else "Skip Rest").click()
+        elif stage == "feedback":
+            _button(self.at, "Confirm & Rest").click()
+        elif stage == "summary":
+            _button(self.at, "Finish & Save Day").click()
+
+
+def _rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def serve(folder, roles, duration):
+    """One server process: runs its sessions as threads for `duration` seconds."""
+    sys.path.insert(0, REPO_ROOT)  # "" in sys.path stops pointing at the repo after chdir
+    os.chdir(folder)
+    os.environ["LIFE_RPG_MEDIA_FETCH"] = "0"
+    run_lock = threading.Lock()
+    # An idle server: modules imported and one page already rendered
+    Session("log", run_lock).run()
+    rss_idle = _rss_kb()
+    cpu0 = time.process_time()
+
+    sessions = [Session(role, run_lock) for role in roles]
+    for s in sessions:
+        s.run()
+    deadline = time.monotonic() + duration
+
+    def loop(s):
+        while time.monotonic() < deadline and len(s.errors) < 5:
+            next_at = time.monotonic() + THINK_SECONDS[s.role]
+            try:
+                s.step()
+            except (StopIteration, KeyError) as e:
+                s.errors.append(f"{type(e).__name__}: {e}")
+                s.run()
+            time.sleep(max(0.0, next_at - time.monotonic()))
+
+    threads = [threading.Thread(target=loop, args=(s,)) for s in sessions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {
+        "latencies": {role: [x for s in sessions if s.role == role for x in s.latencies] for role in THINK_SECONDS},
+        "errors": sorted({e for s in sessions for e in s.errors}),
+        "rss_growth_kb": _rss_kb() - rss_idle,
+        "cpu_seconds": time.process_time() - cpu0,
+        "sessions": len(sessions),
+    }
+
+
+def measure(n, mix, procs, duration, size):
+    roles = [mix[i % len(mix)] for i in range(n)]
+    shares = [roles[p::procs] for p in range(procs) if roles[p::procs]]
+    days, sets = synthetic.SIZES[size]
+    with tempfile.TemporaryDirectory() as folder:
+        synthetic.write_dataset(folder, days, sets)
+        t0 = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(len(shares)) as pool:
+            results = pool.starmap(serve, [(folder, share, duration) for share in shares])
+        wall = time.perf_counter() - t0
+
+    by_role = {role: [x for r in results for x in r["latencies"][role]] for role in THINK_SECONDS}
+    every = [x for xs in by_role.values() for x in xs]
+    cpu = sum(r["cpu_seconds"] for r in results)
+
+    def ms(value):
+        return None if value is None else round(value * 1e3, 1)
+
+    return {
+        "sessions": n,
+        "procs": len(shares),
+        "reruns": len(every),
+        "reruns_per_sec": round(len(every) / duration, 1),
+        "p50_ms": ms(_percentile(every, 50)),
+        "p95_ms": ms(_percentile(every, 95)),
+        "by_role": {role: {"reruns": len(xs), "p50_ms": ms(_percentile(xs, 50)), "p95_ms": ms(_percentile(xs, 95))}
+                    for role, xs in by_role.items() if xs},
+        "mem_per_session_mb": round(sum(r["rss_growth_kb"] for r in results) / 1024 / n, 2),
+        "cpu_seconds": round(cpu, 2),
+        "cpu_util": round(cpu / (duration * len(shares)), 2),  # share of the servers' cores kept busy
+        "wall_seconds": round(wall, 1),
+        "errors": sorted({e for r in results for e in r["errors"]}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--mix", nargs="+", default=["log", "workout", "history"], choices=list(THINK_SECONDS),
+                        help="roles handed out to sessions in turn")
+    parser.add_argument("--procs", type=int, default=1, help="server processes to spread sessions over")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load per session count")
+    parser.add_argument("--size", default="1y", choices=list(synthetic.SIZES))
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sessions:
+        results.append(measure(n, args.mix, args.procs, args.duration, args.size))
+        print(json.dumps(results[-1]), flush=True)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
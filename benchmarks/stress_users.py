@@ -0,0 +1,116 @@
+"""Multi-user save stress test.
+
+Every simulated household member saves days and rep sets at the same time
+through data_manager. Runs each user count twice: once with per-user
+namespaces (own files, own writer thread) and once with everyone writing
+the single shared dataset. Each user starts with --history days already
+logged, on dates of their own, so the shared file holds everyone's years
+without two rows for one day. Then checks that no rows were lost or
+duplicated and that no user's data leaked into another namespace.
+
+    python -m benchmarks.stress_users --users 1 4 16 --saves 25 --history 365
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+import pandas as pd
+from benchmarks import synthetic
+from modules import data_manager
+
+
+def _row(i):
+    return {"Points": i, "Steps": i * 100, "Sleep_Hours": 7.5, "Wake_Mood": "Normal",
+            "Workout_Done": bool(i % 2), "Food_Bonus": 0, "Study_Mins": 0,
+            "Custom_Notes": "", "Custom_Activities": "[]", "Custom_Mask": 0}
+
+
+@contextlib.contextmanager
+def _in_folder(folder):
+    old = os.getcwd()
+    os.chdir(folder)
+    data_manager.reset_caches()
+    try:
+        yield
+    finally:
+        os.chdir(old)
+        data_manager.reset_caches()
+
+
+def _seed(names, history_days, namespaced):
+    """Writes each user's existing history (all into one file when shared).
+    Users get back-to-back date ranges ending today, so no Date repeats."""
+    frames = {}
+    today = datetime.date.today()
+    for u, name in enumerate(names):
+        with data_manager.as_user(name if namespaced else None):
+            path = data_manager._data().data_file
+        df = synthetic.make_history(history_days, end=today - datetime.timedelta(days=u * history_days), seed=u)
+        frames[path] = pd.concat([frames[path], df]) if path in frames else df
+    for path, df in frames.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_csv(path, index=False)
+
+
+def run(users, saves, history_days, namespaced):
+    """Returns (seconds, {user: (rows, distinct dates) in their file})."""
+    names = [f"user{u:02d}" for u in range(users)]
+    if namespaced:
+        for name in names:
+            data_manager.create_user(name)
+    start = datetime.date(2000, 1, 1)
+    if history_days:
+        _seed(names, history_days, namespaced)
+
+    def work(u, name):
+        with data_manager.as_user(name if namespaced else None):
+            for k in range(saves):
+                day = start + datetime.timedelta(days=u * saves + k)
+                data_manager.save_day(day, _row(k))
+                data_manager.save_reps("Push-ups", k)
+
+    threads = [threading.Thread(target=work, args=(u, name)) for u, name in enumerate(names)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    found = {}
+    for name in names:
+        with data_manager.as_user(name if namespaced else None):
+            dates = pd.read_csv(data_manager._data().data_file)["Date"]
+            found[name] = (len(dates), dates.nunique())
+    return elapsed, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--saves", type=int, default=25, help="days (and sets) saved per user")
+    parser.add_argument("--history", type=int, default=365, help="days already logged per user")
+    args = parser.parse_args()
+
+    results = []
+    for users in args.users:
+        entry = {"users": users, "saves": users * args.saves * 2}
+        for label, namespaced in (("namespaced", True), ("shared_file", False)):
+            with tempfile.TemporaryDirectory() as folder, _in_folder(folder):
+                elapsed, found = run(users, args.saves, args.history, namespaced)
+            expected = (args.saves + args.history) * (1 if namespaced else users)
+            if any(counts != (expected, expected) for counts in found.values()):
+                raise SystemExit(f"{label}, {users} users: expected {expected} distinct days per file, "
+                                 f"found (rows, days) {found}")
+            entry[label] = {"seconds": round(elapsed, 4),
+                            "saves_per_sec": round(entry["saves"] / elapsed, 1)}
+        results.append(entry)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
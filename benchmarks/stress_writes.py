@@ -0,0 +1,100 @@
+"""Concurrent save stress test for the write coordinator.
+
+Many threads save different dates at the same time. Checks that every row
+lands in the file, and compares throughput against the old approach of
+serialized full read-modify-write rewrites.
+
+    python -m benchmarks.stress_writes --threads 32 --saves 20
+"""
+import argparse
+import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+import pandas as pd
+from modules import storage
+from modules.writer import WriteCoordinator
+
+
+def _row(i):
+    return {"Points": i, "Steps": i * 100, "Sleep_Hours": 7.5, "Wake_Mood": "Normal",
+            "Workout_Done": bool(i % 2), "Food_Bonus": 0, "Study_Mins": 0,
+            "Custom_Notes": "", "Custom_Activities": "[]"}
+
+
+def _dates(threads, saves):
+    start = datetime.date(2000, 1, 1)
+    return [[(start + datetime.timedelta(days=t * saves + k)).isoformat() for k in range(saves)]
+            for t in range(threads)]
+
+
+def _run_threads(work, per_thread):
+    threads = [threading.Thread(target=work, args=(dates,)) for dates in per_thread]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0
+
+
+def run_coordinator(folder, threads, saves):
+    coordinator = WriteCoordinator()
+    backend = storage.CsvBackend(os.path.join(folder, "coord.csv"), os.path.join(folder, "reps.csv"), coordinator)
+
+    def work(dates):
+        for i, date_str in enumerate(dates):
+            backend.save_day(date_str, _row(i))
+
+    elapsed = _run_threads(work, _dates(threads, saves))
+    df = pd.read_csv(backend.data_file)
+    return elapsed, df["Date"].nunique(), coordinator.commits
+
+
+def run_serialized_rewrites(folder, threads, saves):
+    """The pre-coordinator save_day, made safe with one global lock."""
+    path = os.path.join(folder, "serial.csv")
+    lock = threading.Lock()
+
+    def save_day(date_str, data):
+        with lock:
+            df = pd.read_csv(path) if os.path.exists(path) else storage.empty_history()
+            df = df[df["Date"] != date_str]
+            df = pd.concat([df, pd.DataFrame([dict(data, Date=date_str)])], ignore_index=True)
+            df.to_csv(path, index=False)
+
+    def work(dates):
+        for i, date_str in enumerate(dates):
+            save_day(date_str, _row(i))
+
+    elapsed = _run_threads(work, _dates(threads, saves))
+    return elapsed, pd.read_csv(path)["Date"].nunique(), threads * saves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--saves", type=int, default=20, help="saves per thread")
+    args = parser.parse_args()
+    expected = args.threads * args.saves
+
+    with tempfile.TemporaryDirectory() as folder:
+        c_time, c_rows, c_commits = run_coordinator(folder, args.threads, args.saves)
+        s_time, s_rows, s_commits = run_serialized_rewrites(folder, args.threads, args.saves)
+
+    result = {
+        "expected_rows": expected,
+        "coordinator": {"seconds": round(c_time, 4), "rows": c_rows, "file_writes": c_commits,
+                        "saves_per_sec": round(expected / c_time, 1)},
+        "serialized_rewrites": {"seconds": round(s_time, 4), "rows": s_rows, "file_writes": s_commits,
+                                "saves_per_sec": round(expected / s_time, 1)},
+    }
+    print(json.dumps(result, indent=2))
+    if c_rows != expected:
+        raise SystemExit(f"Lost rows: expected {expected}, found {c_rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Synthetic Life RPG data for benchmarks.
+
+    python -m benchmarks.synthetic OUT_DIR --days 3650 --sets 120000
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from modules import habits, scoring, workout
+
+# Named sizes used by the benchmark suite: (days of history, logged sets)
+SIZES = {
+    "1y": (365, 4_000),
+    "10y": (3_650, 40_000),
+    "10y_120k_sets": (3_650, 120_000),
+}
+
+ACTIVITIES = pd.DataFrame([
+    {"ID": 0, "Activity": "Wash Dishes", "Points": 10},
+    {"ID": 1, "Activity": "Walk Dogs", "Points": 20},
+    {"ID": 2, "Activity": "Read 20 Pages", "Points": 15},
+    {"ID": 3, "Activity": "Meditate", "Points": 10},
+])
+
+
+def make_history(days, end=None, seed=0):
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.today().normalize())
+    dates = pd.date_range(end=end, periods=days, freq="D")
+    names = ACTIVITIES["Activity"].to_numpy()
+    masks = rng.integers(0, 1 << len(names), days)
+    df = pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Points": 0,
+        "Steps": rng.integers(0, 20_000, days),
+        "Sleep_Hours": rng.choice(np.arange(4, 11, 0.5), days),
+        "Wake_Mood": rng.choice(["Groggy", "Tired", "Normal", "Energized"], days),
+        "Workout_Done": rng.random(days) < 0.6,
+        "Food_Bonus": 0,
+        "Study_Mins": rng.choice(np.arange(0, 241, 15), days),
+        "Custom_Notes": "",
+        "Custom_Activities": [str([n for i, n in enumerate(names) if m >> i & 1]) for m in masks],
+        "Custom_Mask": masks,
+    })
+    for field in scoring.ITEMIZED_FIELDS:
+        df[field] = rng.random(days) < 0.3
+    return df
+
+
+def make_reps(sets, end=None, seed=1):
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.today().normalize()) + pd.Timedelta(hours=23)
+    exercises = np.array(list(workout.EXERCISE_DB.keys()))
+    # Sets spread over ~10 sets a day, oldest first
+    offsets = np.sort(rng.integers(0, max(sets // 10, 1) * 86_400, sets))[::-1]
+    stamps = (end - pd.to_timedelta(offsets, unit="s")).strftime("%Y-%m-%d %H:%M:%S")
+    return pd.DataFrame({
+        "Timestamp": stamps,
+        "Exercise": rng.choice(exercises, sets),
+        "Reps": rng.integers(5, 30, sets),
+    })
+
+
+def write_dataset(folder, days, sets):
+    """Writes life_rpg_data.csv, reps_history.csv and custom_activities.csv into folder."""
+    os.makedirs(folder, exist_ok=True)
+    history = make_history(days)
+    masks = history["Custom_Mask"].to_numpy(dtype=np.int64)
+    history["Points"] = scoring.score_frame(history, habits.habit_points(masks, ACTIVITIES))["Points"]
+    history.to_csv(os.path.join(folder, "life_rpg_data.csv"), index=False)
+    make_reps(sets).to_csv(os.path.join(folder, "reps_history.csv"), index=False)
+    ACTIVITIES.to_csv(os.path.join(folder, "custom_activities.csv"), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("folder")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sets", type=int, default=4_000)
+    args = parser.parse_args()
+    write_dataset(args.folder, args.days, args.sets)
+
+
+if __name__ == "__main__":
+    main()
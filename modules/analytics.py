@@ -0,0 +1,165 @@
+import threading
+import numpy as np
+import pandas as pd
+from modules import data_manager
+
+# --- ANALYTICS ---
+# Rolling averages and weekly/monthly rollups for the History tab (streaks
+# and headline totals come from modules.summary).
+# Everything is computed once from the full history, then kept current by
+# save_day/save_reps, which only touch the days, weeks and months they change.
+
+ROLLING_WINDOWS = (7, 30)
+ROLLING_COLUMNS = {"Points": "Points", "Steps": "Steps", "Sleep": "Sleep_Hours"}
+DAILY_COLUMNS = ["Points", "Steps", "Sleep_Hours", "Workout"]
+
+
+def _daily_frame(history_df):
+    """One row per calendar day between the first and last log (NaN = not logged)."""
+    if history_df.empty:
+        return pd.DataFrame(columns=DAILY_COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+    df = pd.DataFrame({
+        "Date": pd.to_datetime(history_df["Date"]),
+        "Points": pd.to_numeric(history_df["Points"], errors="coerce"),
+        "Steps": pd.to_numeric(history_df["Steps"], errors="coerce"),
+        "Sleep_Hours": pd.to_numeric(history_df["Sleep_Hours"], errors="coerce"),
+        "Workout": history_df["Workout_Done"].fillna(False).astype(bool).astype(float),
+    }).drop_duplicates("Date", keep="last").set_index("Date").sort_index()
+    full_range = pd.date_range(df.index.min(), df.index.max(), freq="D", name="Date")
+    return df.reindex(full_range)
+
+
+def _rolling(daily):
+    out = pd.DataFrame(index=daily.index)
+    for label, col in ROLLING_COLUMNS.items():
+        for window in ROLLING_WINDOWS:
+            out[f"{label}_{window}d"] = daily[col].rolling(window, min_periods=1).mean()
+    return out
+
+
+def _rollup(daily, freq):
+    grouped = daily.resample(freq)
+    return pd.DataFrame({
+        "Points": grouped["Points"].sum(),
+        "Steps": grouped["Steps"].sum(),
+        "Sleep_Hours": grouped["Sleep_Hours"].mean(),
+        "Workouts": grouped["Workout"].sum(),
+        "Days_Logged": grouped["Points"].count(),
+    })
+
+
+def _float(value):
+    """Day values as floats; missing (absent or None, as imports leave them) is NaN."""
+    return np.nan if value is None else float(value)
+
+
+def _reps_weekly(reps_df):
+    if reps_df.empty:
+        return pd.DataFrame()
+    ts = pd.to_datetime(reps_df["Timestamp"], errors="coerce")
+    week = ts.dt.to_period("W-SUN").dt.start_time
+    return reps_df.assign(Week=week).pivot_table(index="Week", columns="Exercise",
+                                                 values="Reps", aggfunc="sum", fill_value=0)
+
+
+class AggregateStore:
+    """Precomputed series for the History charts, updated one day at a time."""
+
+    def __init__(self, history_df, reps_df):
+        self.daily = _daily_frame(history_df)
+        self.rolling = _rolling(self.daily)
+        self.weekly = _rollup(self.daily, "W-SUN")
+        self.monthly = _rollup(self.daily, "MS")
+        self.reps_weekly = _reps_weekly(reps_df)
+
+    # --- Incremental updates ---
+    def _extend_to(self, day):
+        if len(self.daily) and self.daily.index.min() <= day <= self.daily.index.max():
+            return
+        start = min(day, self.daily.index.min()) if len(self.daily) else day
+        end = max(day, self.daily.index.max()) if len(self.daily) else day
+        full_range = pd.date_range(start, end, freq="D", name="Date")
+        self.daily = self.daily.reindex(full_range)
+        self.rolling = self.rolling.reindex(full_range)
+
+    def update_day(self, date_str, data_dict):
+        day = pd.Timestamp(date_str)
+        self._extend_to(day)
+        self.daily.loc[day, DAILY_COLUMNS] = [
+            _float(data_dict.get("Points")),
+            _float(data_dict.get("Steps")),
+            _float(data_dict.get("Sleep_Hours")),
+            float(bool(data_dict.get("Workout_Done", False))),
+        ]
+
+        # Rolling means: only the next 30 days can see this day
+        longest_window = max(ROLLING_WINDOWS)
+        lo = day - pd.Timedelta(days=longest_window - 1)
+        hi = day + pd.Timedelta(days=longest_window - 1)
+        window = self.daily.loc[lo:hi]
+        self.rolling.loc[day:hi] = _rolling(window).loc[day:hi]
+
+        # Rollups: recompute just this day's week and month
+        for attr, freq, period_freq in (("weekly", "W-SUN", "W-SUN"), ("monthly", "MS", "M")):
+            period = day.to_period(period_freq)
+            bucket = _rollup(self.daily.loc[period.start_time:period.end_time], freq)
+            table = getattr(self, attr)
+            for idx, row in bucket.iterrows():
+                table.loc[idx] = row
+            setattr(self, attr, table.sort_index())
+
+    def add_set(self, timestamp, exercise_name, reps_count):
+        week = pd.Timestamp(timestamp).to_period("W-SUN").start_time
+        if exercise_name not in self.reps_weekly.columns:
+            self.reps_weekly[exercise_name] = 0
+        if week not in self.reps_weekly.index:
+            self.reps_weekly.loc[week] = 0
+            self.reps_weekly = self.reps_weekly.sort_index()
+        self.reps_weekly.loc[week, exercise_name] += int(reps_count)
+
+    # --- Reads ---
+    def recent(self, days=90):
+        """Rolling series for the last `days` days only."""
+        return self.rolling.iloc[-days:]
+
+
+# One store per user, each with the storage stamp it was built from
+_stores = {}
+_lock = threading.Lock()
+
+
+def _stamp():
+    backend = data_manager.get_backend()
+    return (backend.history_stamp(), backend.reps_stamp())
+
+
+def _on_save_day(date_str, data_dict):
+    user = data_manager.current_user()
+    with _lock:
+        if user in _stores:
+            _stores[user][0].update_day(date_str, data_dict)
+            _stores[user] = (_stores[user][0], _stamp())
+
+
+def _on_save_reps(timestamp, exercise_name, reps_count):
+    user = data_manager.current_user()
+    with _lock:
+        if user in _stores:
+            _stores[user][0].add_set(timestamp, exercise_name, reps_count)
+            _stores[user] = (_stores[user][0], _stamp())
+
+
+data_manager.on_save_day(_on_save_day)
+data_manager.on_save_reps(_on_save_reps)
+
+
+def get_store():
+    """The current user's AggregateStore, rebuilt only if the data changed outside this process."""
+    user = data_manager.current_user()
+    with _lock:
+        stamp = _stamp()
+        store, store_stamp = _stores.get(user, (None, None))
+        if store is None or stamp != store_stamp:
+            store = AggregateStore(data_manager.load_history(), data_manager.get_backend().load_reps())
+            _stores[user] = (store, stamp)
+        return store
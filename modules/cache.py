@@ -0,0 +1,188 @@
+import threading
+from collections import deque, namedtuple
+
+
+class HistoryCache:
+    """Process-wide copy of the parsed history, shared by every session and rerun.
+
+    The cached value (the history frame, or the plain per-date dict used by
+    the Daily Log) is reused until its stamp changes: either the storage
+    stamp (file mtime/size, or the database change counter) or the local
+    version counter that save_day bumps. Treat the returned value as read-only.
+    """
+
+    def __init__(self, loader, stamp_fn):
+        self._loader = loader
+        self._stamp_fn = stamp_fn
+        self._lock = threading.Lock()
+        self._version = 0
+        self._stamp = None
+        self._df = None
+        self._sorted = None
+        self.hits = 0
+        self.misses = 0
+
+    def _current_stamp(self):
+        return (self._version, self._stamp_fn())
+
+    def _refresh(self):
+        stamp = self._current_stamp()
+        if self._df is not None and stamp == self._stamp:
+            self.hits += 1
+            return
+        self.misses += 1
+        self._df = self._loader()
+        self._sorted = None
+        self._stamp = stamp
+
+    def get(self):
+        with self._lock:
+            self._refresh()
+            return self._df
+
+    def peek(self):
+        """The cached value if it is still current, else None (never loads)."""
+        with self._lock:
+            if self._df is None or self._current_stamp() != self._stamp:
+                return None
+            self.hits += 1
+            return self._df
+
+    def get_sorted(self):
+        """History sorted by Date (ascending), sorted once per load."""
+        with self._lock:
+            self._refresh()
+            if self._sorted is None:
+                self._sorted = self._df.sort_values("Date", kind="stable").reset_index(drop=True)
+            return self._sorted
+
+    def bump(self):
+        """Marks the cache stale after a write made through this process."""
+        with self._lock:
+            self._version += 1
+
+    def patch(self, stamp_before, fn):
+        """Applies a write made through this process to the cached value in place
+        with fn(value), if the cache was current just before the write (storage
+        stamp `stamp_before`). Otherwise the cache is marked stale."""
+        with self._lock:
+            if self._df is not None and self._stamp == (self._version, stamp_before):
+                fn(self._df)
+                self._stamp = self._current_stamp()
+            else:
+                self._version += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "version": self._version}
+
+
+# One loaded copy of the custom activity config. `items` keeps config order;
+# `points` and `ids` are keyed by activity name.
+Activities = namedtuple("Activities", ["version", "items", "points", "ids"])
+
+
+class ActivityRegistry:
+    """The custom activity config, parsed once and shared by every tab.
+
+    Reloaded only when the config file changes on disk or bump() is called
+    after a save. Each reload gets a new version number.
+    """
+
+    def __init__(self, loader, stamp_fn):
+        self._loader = loader
+        self._stamp_fn = stamp_fn
+        self._lock = threading.Lock()
+        self._bumps = 0
+        self._stamp = None
+        self._snapshot = None
+
+    def get(self):
+        with self._lock:
+            stamp = (self._bumps, self._stamp_fn())
+            if self._snapshot is None or stamp != self._stamp:
+                items = tuple(self._loader())
+                version = self._snapshot.version + 1 if self._snapshot else 1
+                self._snapshot = Activities(version, items,
+                                            {a["Activity"]: a["Points"] for a in items},
+                                            {a["Activity"]: a["ID"] for a in items})
+                self._stamp = (self._bumps, self._stamp_fn())
+            return self._snapshot
+
+    def bump(self):
+        with self._lock:
+            self._bumps += 1
+
+
+class ExerciseStats:
+    """Ring buffer of the latest sets for one exercise."""
+
+    __slots__ = ("recent",)
+
+    def __init__(self, window):
+        self.recent = deque(maxlen=window)
+
+    def add(self, reps):
+        self.recent.append(reps)
+
+
+class RepIndex:
+    """Per-exercise rep stats, built once from the reps store and then updated in place.
+
+    A rebuild only happens if the store changed behind our back (another
+    process, or a manual edit of the file).
+    """
+
+    def __init__(self, loader, stamp_fn, window=3):
+        self._loader = loader
+        self._stamp_fn = stamp_fn
+        self._window = window
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._by_exercise = None
+
+    def _build(self):
+        df = self._loader()
+        index = {}
+        if not df.empty:
+            df = df.sort_values("Timestamp", kind="stable")
+            recent = df.groupby("Exercise").tail(self._window)
+            for name, reps in zip(recent["Exercise"], recent["Reps"]):
+                if name not in index:
+                    index[name] = ExerciseStats(self._window)
+                index[name].add(int(reps))
+        self._by_exercise = index
+
+    def _refresh(self):
+        stamp = self._stamp_fn()
+        if self._by_exercise is None or stamp != self._stamp:
+            self._build()
+            self._stamp = stamp
+
+    def get(self, exercise_name):
+        """Returns the ExerciseStats for an exercise, or None if it was never logged."""
+        with self._lock:
+            self._refresh()
+            return self._by_exercise.get(exercise_name)
+
+    def get_many(self, exercise_names):
+        """Stats for several exercises with a single freshness check."""
+        with self._lock:
+            self._refresh()
+            return {name: self._by_exercise.get(name) for name in exercise_names}
+
+    def record(self, exercise_name, reps):
+        """Adds a freshly saved set without re-reading the store."""
+        with self._lock:
+            if self._by_exercise is None:
+                return
+            stats = self._by_exercise.get(exercise_name)
+            if stats is None:
+                stats = self._by_exercise[exercise_name] = ExerciseStats(self._window)
+            stats.add(int(reps))
+            self._stamp = self._stamp_fn()
+
+    def sync(self):
+        """Accepts the store's new stamp after writing sets that were already recorded."""
+        with self._lock:
+            if self._by_exercise is not None:
+                self._stamp = self._stamp_fn()
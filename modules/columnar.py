@@ -0,0 +1,138 @@
+import pandas as pd
+
+# --- COLUMNAR EXPORT & STREAMING IMPORT ---
+# Export: history and reps are written as hive-partitioned datasets
+# (Parquet by default, or Arrow IPC), so a reader can load just the
+# columns and partitions it needs:
+#   export/history/Year=2025/Month=3/part-0.parquet
+#   export/reps/Exercise=Push-ups/part-0.parquet
+# pyarrow is optional: only these functions need it.
+#
+# Import: external tracker exports (steps, sleep...) are read in fixed-size
+# chunks and reduced to one value per day as they stream in, so memory is
+# bounded by the number of days, not the size of the file.
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+HISTORY_PARTITIONS = ["Year", "Month"]
+REPS_PARTITIONS = ["Exercise"]
+CHUNK_ROWS = 50_000
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError:
+        raise ImportError("Columnar export needs pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.dataset
+
+
+def _file_format(fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r} (use one of {', '.join(FORMATS)})")
+    return "ipc" if fmt == "arrow" else fmt
+
+
+def _write(df, dest, partitions, fmt):
+    pa, ds = _pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(table, dest, format=_file_format(fmt), partitioning=partitions,
+                     partitioning_flavor="hive", existing_data_behavior="delete_matching",
+                     basename_template="part-{i}" + FORMATS[fmt])
+    return len(df)
+
+
+def export_history(history_df, dest, fmt="parquet"):
+    """Writes history partitioned by Year/Month of its Date. Returns the rows written."""
+    dates = pd.to_datetime(history_df["Date"], errors="coerce")
+    df = history_df.assign(Date=dates.dt.strftime("%Y-%m-%d"), Year=dates.dt.year.astype("Int64"),
+                           Month=dates.dt.month.astype("Int64"))
+    if "Workout_Done" in df.columns:
+        df["Workout_Done"] = df["Workout_Done"].astype("boolean")
+    # Mixed object columns (str(list), notes) are stored as text
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].astype("string")
+    return _write(df, dest, HISTORY_PARTITIONS, fmt)
+
+
+def export_reps(reps_df, dest, fmt="parquet"):
+    """Writes rep sets partitioned by Exercise. Returns the rows written."""
+    df = reps_df.astype({"Timestamp": "string", "Exercise": "string", "Reps": "Int64"})
+    return _write(df, dest, REPS_PARTITIONS, fmt)
+
+
+def _read(src, columns, filter_expr, fmt):
+    _, ds = _pyarrow()
+    dataset = ds.dataset(src, format=_file_format(fmt), partitioning="hive")
+    return dataset.to_table(columns=columns, filter=filter_expr).to_pandas()
+
+
+def read_history(src, columns=None, start=None, end=None, fmt="parquet"):
+    """Reads an exported history, only touching the months between start and end
+    (datetime.date, inclusive) and only the requested columns."""
+    _, ds = _pyarrow()
+    month = ds.field("Year") * 12 + ds.field("Month")
+    conds = []
+    if start is not None:
+        conds += [month >= start.year * 12 + start.month, ds.field("Date") >= start.isoformat()]
+    if end is not None:
+        conds += [month <= end.year * 12 + end.month, ds.field("Date") <= end.isoformat()]
+    expr = None
+    for cond in conds:
+        expr = cond if expr is None else expr & cond
+    return _read(src, columns, expr, fmt)
+
+
+def read_reps(src, columns=None, exercises=None, fmt="parquet"):
+    """Reads exported sets, only opening the given exercises' partitions."""
+    _, ds = _pyarrow()
+    expr = ds.field("Exercise").isin(list(exercises)) if exercises else None
+    return _read(src, columns, expr, fmt)
+
+
+# --- STREAMING IMPORT ---
+def daily_totals(source, date_column, fields, chunksize=CHUNK_ROWS):
+    """Streams a CSV (path or file object) and reduces it to one row per day.
+
+    `fields` maps a history field to (source column, how), where how is
+    "sum", "max" or "last", e.g. {"Steps": ("steps", "sum")}. Duration
+    columns are used as-is, so convert them to the history's units first
+    (Sleep_Hours is in hours). Returns {date_str: {field: value}}."""
+    usecols = [date_column] + [col for col, _ in fields.values()]
+    days = {}
+    for chunk in pd.read_csv(source, usecols=usecols, chunksize=chunksize):
+        dates = pd.to_datetime(chunk[date_column], errors="coerce").dt.strftime("%Y-%m-%d")
+        chunk = chunk.assign(_day=dates).dropna(subset=["_day"])
+        for field, (col, how) in fields.items():
+            # Blank cells are dropped first: a day with no values gets no entry,
+            # rather than a "sum" of 0 that would overwrite the stored value
+            values = pd.to_numeric(chunk[col], errors="coerce").dropna()
+            per_day = values.groupby(chunk["_day"]).agg(how)
+            for day, value in per_day.items():
+                row = days.setdefault(day, {})
+                if field in row and how == "sum":
+                    row[field] += value
+                elif field in row and how == "max":
+                    row[field] = max(row[field], value)
+                else:
+                    row[field] = value
+    return days
+
+
+def merge_days(history_df, days, fill):
+    """Merges per-day values into a history frame. Existing days keep their other
+    fields; new days start from `fill`. Returns (merged frame, dates touched)."""
+    if not days:
+        return history_df, []
+    updates = pd.DataFrame.from_dict(days, orient="index")
+    updates.index.name = "Date"
+    merged = history_df.assign(Date=history_df["Date"].astype(str)).set_index("Date")
+    new_dates = updates.index.difference(merged.index)
+    if len(new_dates):
+        merged = pd.concat([merged, pd.DataFrame([fill] * len(new_dates), index=new_dates)])
+    for col in updates.columns:
+        if col not in merged.columns:
+            merged[col] = None
+        merged.loc[updates.index, col] = updates[col].where(updates[col].notna(), merged.loc[updates.index, col])
+    merged.index.name = "Date"
+    return merged.sort_index().reset_index(), list(updates.index)
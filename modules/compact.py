@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+from modules import profiler, scoring
+
+# --- COMPACT HISTORY ---
+# The history frame gets an explicit schema instead of whatever read_csv
+# infers: datetime64 dates, small ints, float32 sleep, bools for flags
+# (nullable where legacy days left them blank), a 63-bit habit mask, and
+# categories for the few distinct moods and habit lists.
+#
+# The typed columns are also kept as .npy files next to the history CSV,
+# in a folder named after the CSV's stamp (mtime, size):
+#   life_rpg_data.npcache/1718000000000000000-52311/Points.npy
+# They are opened memory-mapped, so a cold load skips CSV parsing and
+# every process on the machine shares the same pages. Maps are
+# copy-on-write: changing a loaded frame never touches the files.
+
+MOODS = ["Groggy", "Tired", "Normal", "Energized"]
+INT_TYPES = {"Points": "int32", "Steps": "int32", "Food_Bonus": "int16", "Study_Mins": "int16"}
+FLOAT_TYPES = {"Sleep_Hours": "float32"}
+BOOL_COLUMNS = {"Workout_Done", *scoring.ITEMIZED_FIELDS}
+MASK_COLUMNS = {"Custom_Mask"}  # nullable Int64: legacy days have no mask
+CATEGORY_COLUMNS = {"Wake_Mood", "Custom_Activities", "Custom_Notes"}
+
+_write_lock = threading.Lock()
+
+
+def _typed_column(name, col):
+    if name == "Date":
+        return pd.to_datetime(col, format="%Y-%m-%d", errors="coerce").astype("datetime64[s]")
+    if name in INT_TYPES:
+        numbers = pd.to_numeric(col, errors="coerce")
+        if numbers.isna().any():
+            return numbers.round().astype(INT_TYPES[name].capitalize())
+        return numbers.astype(INT_TYPES[name])
+    if name in FLOAT_TYPES:
+        return pd.to_numeric(col, errors="coerce").astype(FLOAT_TYPES[name])
+    if name in MASK_COLUMNS:
+        return pd.to_numeric(col, errors="coerce").astype("Int64")
+    if name in BOOL_COLUMNS:
+        if col.isna().any():
+            return col.astype(object).map(_to_bool, na_action="ignore").astype("boolean")
+        return col if col.dtype == bool else col.map(_to_bool).astype(bool)
+    if name in CATEGORY_COLUMNS:
+        values = col.where(col.isna(), col.astype(str))
+        seen = set(values.dropna())
+        categories = MOODS + sorted(seen - set(MOODS)) if name == "Wake_Mood" else sorted(seen)
+        return values.astype(pd.CategoricalDtype(_text_index(categories)))
+    return col
+
+
+def _text_index(values):
+    return pd.Index(values, dtype="str")
+
+
+def _to_bool(value):
+    return value in ("True", "true", "1", "1.0") if isinstance(value, str) else bool(value)
+
+
+def typed(df):
+    """The history frame with the compact schema applied (unknown columns unchanged)."""
+    return pd.DataFrame({name: _typed_column(name, df[name]) for name in df.columns}, index=df.index)
+
+
+# --- MEMORY-MAPPED CACHE ---
+def cache_dir(data_file):
+    return os.path.splitext(data_file)[0] + ".npcache"
+
+
+def _stamp_name(stamp):
+    return "-".join(str(part) for part in stamp)
+
+
+def save(df, folder, stamp):
+    """Writes the typed frame as one .npy per column (plus masks and categories)."""
+    columns = []
+    tmp = os.path.join(folder, f"tmp-{os.getpid()}-{threading.get_ident()}")
+    os.makedirs(tmp, exist_ok=True)
+    for name in df.columns:
+        col = df[name]
+        entry = {"name": name, "file": f"{name}.npy"}
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            entry.update(kind="category", categories=[str(c) for c in col.cat.categories])
+            data = col.cat.codes.to_numpy()
+        elif isinstance(col.dtype, pd.api.extensions.ExtensionDtype) and hasattr(col.dtype, "numpy_dtype"):
+            entry.update(kind="masked", dtype=str(col.dtype), mask=f"{name}.mask.npy")
+            data = col.to_numpy(dtype=col.dtype.numpy_dtype, na_value=0)
+            np.save(os.path.join(tmp, entry["mask"]), col.isna().to_numpy())
+        elif col.dtype.kind in "biufM":
+            entry["kind"] = "numpy"
+            data = col.to_numpy()
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return None  # A column with no fixed-width layout: don't cache
+        np.save(os.path.join(tmp, entry["file"]), np.ascontiguousarray(data))
+        columns.append(entry)
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({"rows": len(df), "columns": columns}, f)
+
+    final = os.path.join(folder, _stamp_name(stamp))
+    try:
+        os.rename(tmp, final)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)  # Another process wrote the same stamp first
+    # Older stamps are dead; open maps of them stay valid until closed
+    for entry in os.listdir(folder):
+        if entry != _stamp_name(stamp) and not entry.startswith("tmp-"):
+            shutil.rmtree(os.path.join(folder, entry), ignore_errors=True)
+    return final
+
+
+def load(folder, stamp):
+    """The cached frame for this stamp, memory-mapped, or None."""
+    path = os.path.join(folder, _stamp_name(stamp))
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    columns = {}
+    for entry in meta["columns"]:
+        data = np.load(os.path.join(path, entry["file"]), mmap_mode="c")
+        if entry["kind"] == "category":
+            columns[entry["name"]] = pd.Categorical.from_codes(data, categories=_text_index(entry["categories"]),
+                                                               validate=False)
+        elif entry["kind"] == "masked":
+            mask = np.load(os.path.join(path, entry["mask"]), mmap_mode="c")
+            array_type = pd.api.types.pandas_dtype(entry["dtype"]).construct_array_type()
+            columns[entry["name"]] = array_type(data, mask)
+        else:
+            columns[entry["name"]] = data
+    return pd.DataFrame(columns, copy=False)
+
+
+def read_csv(data_file, stamp):
+    """The typed history from the .npy cache when it matches the CSV's stamp,
+    otherwise parsed from the CSV and cached for next time."""
+    folder = cache_dir(data_file)
+    df = load(folder, stamp)
+    if df is not None:
+        return df
+    profiler.count_read(data_file)
+    # Nullable ints keep 63-bit habit masks exact next to legacy blanks
+    df = typed(pd.read_csv(data_file, dtype={"Custom_Mask": "Int64"}))
+    with _write_lock:
+        try:
+            os.makedirs(folder, exist_ok=True)
+            save(df, folder, stamp)
+        except OSError:
+            pass  # A read-only data folder still works, just without the cache
+    return df
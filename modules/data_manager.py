@@ -1,110 +1,584 @@
-import pandas as pd
+import csv
 import os
-import streamlit as st
+import re
 import datetime
+import threading
+from modules import habits, profiler, scoring, storage, summary, writer
+from modules.journal import SetJournal
+from modules.cache import ActivityRegistry, HistoryCache, RepIndex
 
 DATA_FILE = "life_rpg_data.csv"
 CONFIG_FILE = "custom_activities.csv"
+REPS_FILE = "reps_history.csv"
+DB_FILE = "life_rpg.db"
+JOURNAL_FILE = "reps_journal.jsonl"
+SUMMARY_FILE = "summary.json"
+
+# "csv" (default) or "sqlite". SQLite imports the CSVs once on first use.
+BACKEND = os.environ.get("LIFE_RPG_BACKEND", "csv")
+
+# --- USERS ---
+# Each player of a shared instance gets a folder under users/ with their own
+# history, reps and custom activities. The default (None) user keeps the
+# original files in the working folder, so single-user setups are unchanged.
+USERS_DIR = "users"
+_USER_NAME = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+
+class UserData:
+    """Everything one user's calls share: file paths, the storage backend,
+    the parsed-data caches and (for named users) a writer thread of their own.
+    Handles are pooled, so each call reuses them instead of reopening files."""
+
+    def __init__(self, user=None):
+        self.user = user
+        self.folder = "." if user is None else os.path.join(USERS_DIR, user)
+        self.data_file = os.path.join(self.folder, DATA_FILE)
+        self.config_file = os.path.join(self.folder, CONFIG_FILE)
+        self.reps_file = os.path.join(self.folder, REPS_FILE)
+        self.db_file = os.path.join(self.folder, DB_FILE)
+        self.journal = SetJournal(os.path.join(self.folder, JOURNAL_FILE))
+        self.summary_file = os.path.join(self.folder, SUMMARY_FILE)
+        # Separate writer per user: saves to different users' files don't queue behind each other
+        self.writer = writer.get_coordinator() if user is None else writer.WriteCoordinator()
+        self._backend = None
+        self._backend_lock = threading.Lock()
+
+        # A rerun only re-parses history when the file (or database)
+        # changed or save_day bumped the version.
+        self.history_cache = HistoryCache(lambda: self.get_backend().load_history(),
+                                          lambda: self.get_backend().history_stamp())
+        # Date -> day dict for the Daily Log, read without pandas so the default
+        # tab renders without paying for the pandas import.
+        self.day_cache = HistoryCache(lambda: self.get_backend().load_days(),
+                                      lambda: self.get_backend().history_stamp())
+        # Last few sets per exercise, kept current by save_reps
+        self.rep_index = RepIndex(lambda: self.get_backend().load_reps(),
+                                  lambda: self.get_backend().reps_stamp(), window=3)
+        # Custom activity config, reloaded only after a save or an outside edit
+        self.activities = ActivityRegistry(lambda: _read_activities(self.config_file, self.writer),
+                                           lambda: storage.file_stamp(self.config_file))
+        # Headline stats, with the history stamp they match
+        self._summary = None
+        self._summary_stamp = None
+        self._summary_lock = threading.Lock()
+
+    def get_backend(self):
+        with self._backend_lock:
+            if self._backend is None:
+                if BACKEND == "sqlite":
+                    self._backend = storage.SqliteBackend(self.db_file)
+                    storage.migrate_csv_to_sqlite(self.csv_backend(), self._backend)
+                else:
+                    self._backend = self.csv_backend()
+                # Sets left behind by a workout that never finished (app only:
+                # a report or backup run must not commit a workout in progress)
+                if _replay_journal:
+                    self.flush_journal(replay=True)
+            return self._backend
+
+    def csv_backend(self):
+        return storage.CsvBackend(self.data_file, self.reps_file, self.writer)
+
+    def bump_history(self):
+        self.history_cache.bump()
+        self.day_cache.bump()
+
+    def _keep_summary(self, record, stamp):
+        self._summary, self._summary_stamp = record, stamp
+        # The SQLite stamp is per connection, so only CSV records survive a restart
+        if self.get_backend().name == "csv":
+            summary.save(self.summary_file, record, stamp)
+
+    def get_summary(self):
+        with self._summary_lock:
+            stamp = self.get_backend().history_stamp()
+            if self._summary is None or stamp != self._summary_stamp:
+                record = summary.load(self.summary_file, stamp) if self.get_backend().name == "csv" else None
+                if record is None:
+                    record = summary.build(self.day_cache.get())
+                self._keep_summary(record, stamp)
+            return self._summary
+
+    def update_summary(self, stamp_before, date_str, old, new):
+        """Applies one saved day to the summary, if it was current before the save."""
+        with self._summary_lock:
+            if self._summary is None or self._summary_stamp != stamp_before:
+                self._summary = None  # rebuilt on the next read
+                return
+            record = dict(self._summary)
+            if not summary.apply_save(record, date_str, old, new):
+                record = summary.build(self.day_cache.get())
+            self._keep_summary(record, self.get_backend().history_stamp())
+
+    def close(self):
+        """Stops this user's writer thread (the shared default writer keeps running)."""
+        if self.user is not None:
+            self.writer.close()
+
+    def flush_journal(self, replay=False):
+        """Moves journaled sets into the reps store in one write. On replay, sets
+        that already reached the store (a crash between write and clear) are skipped."""
+        with self.journal.lock():
+            rows = self.journal.read()
+            if replay and rows:
+                rows = _unsaved_sets(self._backend, rows)
+            if rows:
+                self._backend.append_reps_batch(rows)
+            self.journal.clear()
+        # A replay runs inside get_backend, possibly under a cache's lock: the
+        # changed reps stamp makes the caches rebuild instead.
+        if rows and not replay:
+            self.rep_index.sync()
+            for row in rows:
+                for fn in _save_reps_listeners:
+                    fn(row["Timestamp"], row["Exercise"], row["Reps"])
+        return len(rows)
+
+
+def _unsaved_sets(backend, rows):
+    # Only the journal's time span of the store is read (its months, for CSV)
+    since = datetime.datetime.fromisoformat(min(r["Timestamp"] for r in rows))
+    until = datetime.date.fromisoformat(max(r["Timestamp"] for r in rows)[:10])
+    seen = {(s["Timestamp"].strftime(storage.TIMESTAMP_FORMAT), s["Exercise"], s["Reps"])
+            for s in backend.reps_between(since, until)}
+    return [r for r in rows if (r["Timestamp"], r["Exercise"], int(r["Reps"])) not in seen]
+
+
+_pool = {}
+_pool_lock = threading.Lock()
+_local = threading.local()
+_unset = object()
+_user_resolver = None
+_replay_journal = False
+
+
+def enable_journal_replay():
+    """Lets opening a user's data replay a workout journal left behind by a
+    crash. The app turns this on; scripts and reports leave the journal alone."""
+    global _replay_journal
+    _replay_journal = True
+
+
+def set_user_resolver(fn):
+    """Registers fn() -> user name (or None), called to find the current user.
+    The app passes a function that reads the session's selected player, so
+    fragments and callbacks resolve the same user as the full rerun."""
+    global _user_resolver
+    _user_resolver = fn
+
+
+class as_user:
+    """Runs a block as one user regardless of the resolver (scripts, benchmarks):
+    `with data_manager.as_user("alex"): ...`"""
+
+    def __init__(self, user):
+        self.user = validate_user(user)
+
+    def __enter__(self):
+        self.previous = getattr(_local, "user", _unset)
+        _local.user = self.user
+        return self
+
+    def __exit__(self, *exc):
+        if self.previous is _unset:
+            del _local.user
+        else:
+            _local.user = self.previous
+
+
+def validate_user(user):
+    if user is not None and not _USER_NAME.match(user):
+        raise ValueError("Player names can use letters, digits, '-' and '_' (up to 32 characters).")
+    return user
+
+
+def current_user():
+    user = getattr(_local, "user", _unset)
+    if user is not _unset:
+        return user
+    return validate_user(_user_resolver()) if _user_resolver is not None else None
+
+
+def _data():
+    """The pooled handle of the current user."""
+    user = current_user()
+    handle = _pool.get(user)
+    if handle is None:
+        with _pool_lock:
+            handle = _pool.setdefault(user, UserData(user))
+    return handle
+
+
+def list_users():
+    """Named players that have a data folder, sorted."""
+    if not os.path.isdir(USERS_DIR):
+        return []
+    return sorted(name for name in os.listdir(USERS_DIR)
+                  if _USER_NAME.match(name) and os.path.isdir(os.path.join(USERS_DIR, name)))
+
+
+def existing_user(user):
+    """Checks a player name given on the command line: it must be None (the
+    shared data) or a player from list_users(). Nothing is created."""
+    if validate_user(user) is not None and user not in list_users():
+        known = ", ".join(list_users()) or "none yet"
+        raise ValueError(f"No player named {user!r} (players: {known}).")
+    return user
+
+
+def create_user(user):
+    """Creates an empty data folder for a new player."""
+    validate_user(user)
+    os.makedirs(os.path.join(USERS_DIR, user), exist_ok=True)
+    return user
+
+
+def get_backend():
+    """Returns the storage backend that serves the current user's history and reps."""
+    return _data().get_backend()
+
+# Callbacks run after each save, so derived data (analytics, summaries)
+# can update itself instead of rescanning history. They run on the saving
+# thread, so current_user() is the user who saved.
+_save_day_listeners = []
+_save_reps_listeners = []
+
+def on_save_day(fn):
+    """Registers fn(date_str, data_dict) to run after save_day."""
+    _save_day_listeners.append(fn)
+
+def on_save_reps(fn):
+    """Registers fn(timestamp, exercise_name, reps_count) to run after save_reps."""
+    _save_reps_listeners.append(fn)
 
+def reset_caches():
+    """Drops every pooled backend and in-memory index (e.g. after switching data folders)."""
+    with _pool_lock:
+        for handle in _pool.values():
+            handle.close()
+        _pool.clear()
+
+def cache_stats():
+    """Hit/miss counters for the current user's history cache."""
+    return _data().history_cache.stats()
+
+def migrate_to_sqlite(sqlite_backend=None):
+    """One-shot import of the current user's CSV files into the SQLite database.
+    Does nothing if the database already holds data."""
+    data = _data()
+    if sqlite_backend is None:
+        sqlite_backend = storage.SqliteBackend(data.db_file)
+    return storage.migrate_csv_to_sqlite(data.csv_backend(), sqlite_backend)
+
+@profiler.timed
 def load_history():
-    if os.path.exists(DATA_FILE):
-        return pd.read_csv(DATA_FILE)
-    columns = ["Date", "Points", "Steps", "Sleep_Hours", "Wake_Mood", 
-               "Workout_Done", "Food_Bonus", "Study_Mins", "Custom_Notes", "Custom_Activities"]
-    return pd.DataFrame(columns=columns)
+    """Parsed history, served from the shared cache. Don't modify it in place."""
+    return _data().history_cache.get()
 
+@profiler.timed
+def get_history_page(start=None, end=None, newest_first=True, page=0, page_size=50):
+    """One page of history between two dates (inclusive), plus the number of
+    matching days. Uses the cached date-sorted frame, so a page costs a
+    binary search and a slice rather than a sort of the whole history."""
+    import pandas as pd
+    df = _data().history_cache.get_sorted()
+    # Searches the datetime64 Date column in place (no per-render string copy)
+    dates = df['Date']
+    lo = dates.searchsorted(pd.Timestamp(start)) if start else 0
+    hi = dates.searchsorted(pd.Timestamp(end), side="right") if end else len(dates)
+    total = max(hi - lo, 0)
+    if newest_first:
+        stop = hi - page * page_size
+        rows = df.iloc[max(stop - page_size, lo):max(stop, lo)].iloc[::-1]
+    else:
+        first = lo + page * page_size
+        rows = df.iloc[first:min(first + page_size, hi)]
+    return rows, total
+
+@profiler.timed
 def get_day_data(date_obj):
     """Get data for a specific date, or return empty default."""
-    df = load_history()
     date_str = date_obj.strftime("%Y-%m-%d")
-    row = df[df['Date'] == date_str]
-    if not row.empty:
-        return row.iloc[0]
-    return None
+    # Loaded once, then kept current in place by save_day
+    return _data().day_cache.get().get(date_str)
 
+@profiler.timed
 def save_day(date_obj, data_dict):
-    df = load_history()
     date_str = date_obj.strftime("%Y-%m-%d")
     
-    # Remove existing row for this date
-    if date_str in df['Date'].values:
-        df = df[df['Date'] != date_str]
-    
     # Add date to the data dictionary
     data_dict["Date"] = date_str
     
-    # Save
-    df = pd.concat([df, pd.DataFrame([data_dict])], ignore_index=True)
-    df.to_csv(DATA_FILE, index=False)
+    # Save (replaces any existing row for this date)
+    data = _data()
+    backend = data.get_backend()
+    days = data.day_cache.peek()
+    old = days.get(date_str) if days is not None else backend.get_day(date_str)
+    stamp_before = backend.history_stamp()
+    backend.save_day(date_str, data_dict)
+    # The frame is reloaded when next needed; the day dict just gets the saved
+    # row (as stored: SQLite keeps columns the save didn't mention)
+    data.history_cache.bump()
+    data.day_cache.patch(stamp_before, lambda days: days.__setitem__(date_str, backend.get_day(date_str)))
+    data.update_summary(stamp_before, date_str, old, data_dict)
+    for fn in _save_day_listeners:
+        fn(date_str, data_dict)
     return True
 
+@profiler.timed
+def rescore_history(include_legacy=False):
+    """Recomputes every day's Points with the current scoring rules and
+    custom activity points, in one vectorized pass and one write.
+
+    Days saved before checkboxes were stored individually keep their
+    Points unless include_legacy is set (their side quests and bonuses
+    were never recorded). Returns the number of days whose Points changed."""
+    df = get_backend().load_history()
+    if df.empty:
+        return 0
+    custom_df = load_custom_activities()
+    masks = habits.masks_for(df, habits.id_map(custom_df))
+    scores = scoring.score_frame(df, habits.habit_points(masks, custom_df))
+    mask = scoring.itemized_mask(df) | include_legacy
+    new_points = df['Points'].where(~mask, scores['Points'])
+    changed = int((new_points != df['Points']).sum())
+    if changed:
+        df = df.assign(Points=new_points)
+        get_backend().replace_history(df)
+        _data().bump_history()
+    return changed
+
+DEFAULT_ACTIVITIES = [
+    {"ID": 0, "Activity": "Wash Dishes", "Points": 10},
+    {"ID": 1, "Activity": "Walk Dogs", "Points": 20}
+]
+
+ACTIVITY_COLUMNS = ["ID", "Activity", "Points"]
+
+def _read_activities(config_file, writer_):
+    """The config file as activity dicts, read with the csv module (no pandas)."""
+    if not os.path.exists(config_file):
+        return [dict(a) for a in DEFAULT_ACTIVITIES]
+    profiler.count_read(config_file)
+    with open(config_file, newline="") as f:
+        rows = list(csv.DictReader(f))
+    if rows and "ID" not in rows[0]:
+        # Older config files: number the habits once and keep those IDs
+        for i, row in enumerate(rows):
+            row["ID"] = i
+        writer_.replace_rows(config_file, ACTIVITY_COLUMNS,
+                             [[r["ID"], r["Activity"], r["Points"]] for r in rows])
+    return [{"ID": int(r["ID"]), "Activity": r["Activity"], "Points": int(float(r["Points"]))}
+            for r in rows]
+
+
+@profiler.timed
+def get_activities():
+    """The current user's activity registry snapshot: version, items (config
+    order), and points/ids by name. Served from memory until the config changes."""
+    return _data().activities.get()
+
+@profiler.timed
+def load_activity_list():
+    """Custom habits as a list of dicts (ID, Activity, Points). Don't modify them."""
+    return list(get_activities().items)
+
+@profiler.timed
 def load_custom_activities():
-    """Loads the user's custom habits (Name, Points)."""
-    if os.path.exists(CONFIG_FILE):
-        return pd.read_csv(CONFIG_FILE)
-    return pd.DataFrame([
-        {"Activity": "Wash Dishes", "Points": 10},
-        {"Activity": "Walk Dogs", "Points": 20}
-    ])
+    """Loads the user's custom habits (ID, Name, Points) as a frame."""
+    import pandas as pd
+    return pd.DataFrame(load_activity_list(), columns=ACTIVITY_COLUMNS)
+
+@profiler.timed
+def add_custom_activity(df, name, points):
+    """Appends a habit with a never-used ID and saves the config.
+    Raises ValueError for an empty or duplicate name."""
+    import pandas as pd
+    new_row = {"ID": habits.next_id(df, load_history()), "Activity": name.strip(), "Points": int(points)}
+    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+    save_custom_activities(df)
+    return df
 
-def save_custom_activities(df):
-    df.to_csv(CONFIG_FILE, index=False)
+@profiler.timed
+def save_custom_activities(activities):
+    """Validates and saves the config (a frame or a list of activity dicts)."""
+    if hasattr(activities, "to_dict"):
+        activities = activities.to_dict("records")
+    activities = [{"ID": int(a["ID"]), "Activity": str(a["Activity"]).strip(), "Points": a["Points"]}
+                  for a in activities]
+    habits.validate(activities)
+    data = _data()
+    data.writer.replace_rows(data.config_file, ACTIVITY_COLUMNS,
+                             [[a["ID"], a["Activity"], int(a["Points"])] for a in activities])
+    data.activities.bump()
 
+@profiler.timed
 def get_last_workout_date():
     """Finds the last date the base workout was completed."""
-    df = load_history()
-    if "Workout_Done" not in df.columns or df.empty:
-        return "Never"
-    
-    # Filter for True and sort
-    workouts = df[df['Workout_Done'] == True].sort_values(by="Date", ascending=False)
-    if not workouts.empty:
-        return workouts.iloc[0]['Date']
-    return "Never"
-
-# ... (Keep existing imports and functions: load_history, save_day, etc.) ...
+    return _data().get_summary()["last_workout"] or "Never"
 
-REPS_FILE = "reps_history.csv"
+@profiler.timed
+def get_summary():
+    """Headline stats (see modules/summary.py) plus today's current streak. O(1) once built."""
+    record = _data().get_summary()
+    return dict(record, current_streak=summary.current_streak(record))
 
-def get_target_reps(exercise_name):
-    """Calculates target reps based on average of last 3 sessions + small improvement."""
-    if not os.path.exists(REPS_FILE):
+def _target_from(stats):
+    if stats is None:
         return "10-12" # Default for beginners
     
-    df = pd.read_csv(REPS_FILE)
-    # Filter for specific exercise
-    ex_df = df[df['Exercise'] == exercise_name]
-    
-    if ex_df.empty:
-        return "10-12"
-    
-    # Get last 3 entries
-    last_3 = ex_df.sort_values("Timestamp", ascending=False).head(3)
-    avg_reps = last_3['Reps'].mean()
+    # Average of the last 3 entries
+    avg_reps = sum(stats.recent) / len(stats.recent)
     
     # target is avg + 1 (rounded)
     target = int(avg_reps + 2)
     return f"{target}"
 
+@profiler.timed
+def get_target_reps(exercise_name):
+    """Calculates target reps based on average of last 3 sessions + small improvement."""
+    return _target_from(_data().rep_index.get(exercise_name))
+
+@profiler.timed
+def get_targets(exercise_names):
+    """Targets for several exercises in one pass (see get_target_reps)."""
+    stats = _data().rep_index.get_many(set(exercise_names))
+    return {name: _target_from(s) for name, s in stats.items()}
+
+@profiler.timed
 def save_reps(exercise_name, reps_count):
     """Saves the rep count for a specific exercise."""
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    new_entry = {"Timestamp": timestamp, "Exercise": exercise_name, "Reps": reps_count}
-    
-    if os.path.exists(REPS_FILE):
-        df = pd.read_csv(REPS_FILE)
-    else:
-        df = pd.DataFrame(columns=["Timestamp", "Exercise", "Reps"])
-        
-    df = pd.concat([df, pd.DataFrame([new_entry])], ignore_index=True)
-    df.to_csv(REPS_FILE, index=False)
+    data = _data()
+    data.get_backend().append_reps(timestamp, exercise_name, reps_count)
+    data.rep_index.record(exercise_name, reps_count)
+    for fn in _save_reps_listeners:
+        fn(timestamp, exercise_name, reps_count)
+
+@profiler.timed
+def log_set(exercise_name, reps_count):
+    """Records a workout set in the crash-safe journal (one fsynced line).
+    Targets see it at once; flush_sets() moves it into the reps store."""
+    data = _data()
+    data.get_backend()  # replays any leftover journal before this set joins it
+    data.rep_index.get(exercise_name)  # built now, so record() below isn't a no-op
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    data.journal.append({"Timestamp": timestamp, "Exercise": exercise_name, "Reps": int(reps_count)})
+    data.rep_index.record(exercise_name, reps_count)
+
+@profiler.timed
+def flush_sets():
+    """Merges the journaled sets into the reps store in one write. Returns how many."""
+    data = _data()
+    data.get_backend()
+    return data.flush_journal()
+
+@profiler.timed
+def get_reps_between(start, end):
+    """Every set logged from start to end (dates, inclusive), oldest first,
+    as dicts with a datetime Timestamp. Includes sets not flushed yet."""
+    sets = get_backend().reps_between(start, end)
+    lo, hi = storage.time_bounds(start, end)
+    pending = [storage.parse_set(r["Timestamp"], r["Exercise"], r["Reps"])
+               for r in _data().journal.read() if lo <= r["Timestamp"] < hi]
+    return sorted(sets + pending, key=lambda s: s["Timestamp"]) if pending else sets
+
+def iter_days(start=None, end=None):
+    """Streams day dicts between two dates (inclusive, None = open) without
+    loading the history (storage order: by date for SQLite, file order for CSV)."""
+    return get_backend().iter_days(start and start.isoformat(), end and end.isoformat())
+
+def iter_reps(start, end):
+    """Streams the sets logged from start to end (dates, inclusive) without
+    loading them all, then any sets not flushed yet."""
+    yield from get_backend().iter_reps(start, end)
+    lo, hi = storage.time_bounds(start, end)
+    for r in _data().journal.read():
+        if lo <= r["Timestamp"] < hi:
+            yield storage.parse_set(r["Timestamp"], r["Exercise"], r["Reps"])
 
+@profiler.timed
 def get_session_reps(date_str):
-    """Returns a dictionary of exercises done today."""
-    if not os.path.exists(REPS_FILE):
-        return {}
-    df = pd.read_csv(REPS_FILE)
-    # Filter by date (substring of timestamp)
-    today_df = df[df['Timestamp'].str.contains(date_str)]
-    return dict(zip(today_df.Exercise, today_df.Reps))
-    
+    """Every set logged on one day (see get_reps_between)."""
+    day = datetime.date.fromisoformat(date_str)
+    return get_reps_between(day, day)
+
+# --- COLUMNAR EXPORT / TRACKER IMPORT ---
+EXPORT_DIR = "export"
+
+# Defaults for days that only exist because a tracker export mentioned them
+IMPORTED_DAY = {"Points": 0, "Steps": 0, "Sleep_Hours": None, "Wake_Mood": "Normal",
+                "Workout_Done": False, "Custom_Activities": "[]", "Custom_Mask": 0,
+                "Food_Bonus": 0, "Study_Mins": 0, "Custom_Notes": "",
+                **dict.fromkeys(scoring.ITEMIZED_FIELDS, False)}
+
+def export_dir():
+    """Where the current user's exports go."""
+    return os.path.join(_data().folder, EXPORT_DIR)
+
+@profiler.timed
+def export_columnar(dest=None, fmt="parquet"):
+    """Exports history and reps as partitioned Parquet (or Arrow) datasets
+    under dest/history and dest/reps (default: export_dir()). Returns (days, sets) written."""
+    from modules import columnar
+    dest = dest or export_dir()
+    days = columnar.export_history(load_history(), os.path.join(dest, "history"), fmt)
+    sets = columnar.export_reps(get_backend().load_reps(), os.path.join(dest, "reps"), fmt)
+    return days, sets
+
+@profiler.timed
+def import_tracker_export(source, date_column, fields, chunksize=None):
+    """Streams an external tracker CSV into history (see columnar.daily_totals
+    for `fields`). Imported values overwrite those fields on existing days;
+    touched days are re-scored. Returns the number of days touched."""
+    from modules import columnar
+    days = columnar.daily_totals(source, date_column, fields, chunksize or columnar.CHUNK_ROWS)
+    if not days:
+        return 0
+    history_df, touched = columnar.merge_days(get_backend().load_history(), days, IMPORTED_DAY)
+    if "Steps" in fields:
+        history_df["Steps"] = history_df["Steps"].round().astype("Int64")
+    rows = history_df["Date"].isin(touched).to_numpy()
+    custom_df = load_custom_activities()
+    subset = history_df[rows]
+    masks = habits.masks_for(subset, habits.id_map(custom_df))
+    scores = scoring.score_frame(subset, habits.habit_points(masks, custom_df))
+    rescore = scoring.itemized_mask(subset)
+    history_df.loc[subset.index[rescore], "Points"] = scores["Points"][rescore]
+    get_backend().replace_history(history_df)
+    _data().bump_history()
+    return len(touched)
+
+# --- BACKUP SYNC ---
+MIRROR_DIR = os.environ.get("LIFE_RPG_MIRROR", "mirror")
+
+def _sync_files(data):
+    if BACKEND != "csv":
+        raise ValueError("Backups copy the CSV files; the SQLite database isn't supported yet.")
+    return {"data_file": data.data_file, "reps_dir": data.csv_backend().reps_dir,
+            "config_file": data.config_file}
+
+def mirror_dir():
+    """Where the current user's backups go (one folder per player)."""
+    return os.path.join(MIRROR_DIR, current_user() or "shared")
+
+@profiler.timed
+def backup(mirror=None, full=False):
+    """Sends what changed since the last backup to the mirror (see modules.sync).
+    Returns the change set's index entry, or None if nothing changed."""
+    from modules import sync
+    data = _data()
+    data.csv_backend()._ensure_partitions()
+    return sync.sync(_sync_files(data), mirror or mirror_dir(), full)
+
+@profiler.timed
+def restore_backup(mirror=None, seq=None):
+    """Overwrites the current user's files with a backup (the newest, or change
+    set `seq`) and drops their caches. Returns the seq restored."""
+    from modules import sync
+    data = _data()
+    restored = sync.restore(mirror or mirror_dir(), _sync_files(data), seq)
+    with _pool_lock:
+        _pool.pop(data.user, data).close()
+    return restored
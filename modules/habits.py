@@ -0,0 +1,113 @@
+from modules import scoring
+
+# --- HABIT BITSETS ---
+# Every custom activity has a stable integer ID (the "ID" column of
+# custom_activities.csv). A day's completed habits are stored as one
+# integer, Custom_Mask, with bit ID set for each ticked habit. IDs are
+# never reused, so old days keep meaning the same thing after deletes.
+# The per-day helpers are plain Python; numpy is only imported by the
+# whole-history queries.
+
+MAX_ACTIVITIES = 63  # bits in an int64 mask
+
+
+def id_map(activities):
+    """Activity name -> ID, from the activities frame or a list of activity dicts."""
+    if hasattr(activities, "to_dict"):
+        activities = activities.to_dict("records")
+    return {a['Activity']: int(a['ID']) for a in activities}
+
+
+def validate(activities):
+    """Checks a list of activity dicts before it is saved. Raises ValueError."""
+    seen_names, seen_ids = set(), set()
+    for a in activities:
+        name = str(a['Activity']).strip()
+        if not name:
+            raise ValueError("Activity names can't be empty.")
+        if name.casefold() in seen_names:
+            raise ValueError(f"There is already an activity called '{name}'.")
+        if a['ID'] in seen_ids or not 0 <= a['ID'] < MAX_ACTIVITIES:
+            raise ValueError(f"Invalid or repeated activity ID {a['ID']} for '{name}'.")
+        if int(a['Points']) != a['Points'] or a['Points'] < 1:
+            raise ValueError(f"'{name}' needs a whole number of points above 0.")
+        seen_names.add(name.casefold())
+        seen_ids.add(a['ID'])
+
+
+def encode(names, ids):
+    mask = 0
+    for name in names:
+        if name in ids:
+            mask |= 1 << ids[name]
+    return mask
+
+
+def day_mask(day_data, ids):
+    """The stored mask for one day, falling back to the legacy str(list) column."""
+    if day_data is None:
+        return 0
+    mask = day_data.get('Custom_Mask')
+    if mask is not None and mask == mask:
+        return int(mask)
+    return encode(scoring.parse_activity_list(day_data.get('Custom_Activities')), ids)
+
+
+def masks_for(history_df, ids):
+    """Masks for every row. Legacy rows are parsed once per distinct value, by exact name."""
+    import numpy as np
+    n = len(history_df)
+    masks = np.zeros(n, dtype=np.int64)
+    if 'Custom_Mask' in history_df.columns:
+        stored = history_df['Custom_Mask']
+        has_mask = stored.notna().to_numpy()
+        masks[has_mask] = stored[has_mask].to_numpy(dtype=np.int64)
+    else:
+        has_mask = np.zeros(n, dtype=bool)
+    if not has_mask.all() and 'Custom_Activities' in history_df.columns:
+        legacy = history_df['Custom_Activities'][~has_mask].astype(object)
+        per_value = {v: encode(scoring.parse_activity_list(v), ids) for v in legacy.unique()}
+        masks[~has_mask] = legacy.map(per_value).fillna(0).to_numpy(dtype=np.int64)
+    return masks
+
+
+def bits(masks, custom_df):
+    """Boolean days x activities matrix, columns in config order."""
+    import numpy as np
+    act_ids = custom_df['ID'].to_numpy(dtype=np.int64)
+    return (masks[:, None] >> act_ids) & 1 == 1
+
+
+def habit_points(masks, custom_df):
+    """Vectorized habit points per day."""
+    import numpy as np
+    return bits(masks, custom_df) @ custom_df['Points'].to_numpy(dtype=np.int64)
+
+
+def next_id(custom_df, history_df):
+    """Smallest ID not used by the config or by any saved day."""
+    import numpy as np
+    used = int(custom_df['ID'].max()) + 1 if len(custom_df) else 0
+    if len(history_df):
+        all_bits = int(np.bitwise_or.reduce(masks_for(history_df, id_map(custom_df))))
+        used = max(used, all_bits.bit_length())
+    if used >= MAX_ACTIVITIES:
+        raise ValueError(f"Only {MAX_ACTIVITIES} custom activities can ever be created.")
+    return used
+
+
+def completion_table(history_df, custom_df, days=None):
+    """Days completed and completion rate per habit, optionally over the last `days` days
+    (the rate is then per calendar day, otherwise per logged day)."""
+    import numpy as np
+    df = history_df
+    if days is not None and len(df):
+        dates = df['Date'].astype(str)
+        cutoff = (np.datetime64(dates.max()) - np.timedelta64(days - 1, 'D')).astype(str)
+        df = df[dates >= cutoff]
+    done = bits(masks_for(df, id_map(custom_df)), custom_df)
+    counts = done.sum(axis=0)
+    return custom_df[['Activity']].assign(
+        Days_Done=counts,
+        Rate=counts / (days or len(df) or 1),
+    ).reset_index(drop=True)
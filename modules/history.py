@@ -0,0 +1,58 @@
+import datetime
+import math
+import streamlit as st
+from modules import analytics, data_manager, habits
+
+PAGE_SIZES = [25, 50, 100]
+
+def render_history_tab():
+    st.header("📜 Your Legend")
+    df = data_manager.load_history()
+    if df.empty:
+        st.info("No history yet. Go log your first day!")
+        return
+
+    # --- HEADLINE NUMBERS (from the summary record) ---
+    summary = data_manager.get_summary()
+    m1, m2, m3 = st.columns(3)
+    m1.metric("🔥 Current Streak", f"{summary['current_streak']} days")
+    m2.metric("🏅 Longest Streak", f"{summary['longest_streak']} days")
+    m3.metric("🏋️ Last Workout", summary['last_workout'] or "Never")
+    m4, m5, m6 = st.columns(3)
+    m4.metric("⭐ Total Points", f"{summary['total_points']:,}")
+    m5.metric("👣 Lifetime Steps", f"{summary['lifetime_steps']:,}")
+    m6.metric("🏆 Best Day", f"{summary['best_points']} pts" if summary['best_day'] else "-",
+              help=summary['best_day'])
+
+    # --- TRENDS ---
+    stats = analytics.get_store()
+    st.subheader("📈 Trends (last 90 days)")
+    recent = stats.recent(90)
+    st.line_chart(recent[["Points_7d", "Points_30d"]])
+    st.line_chart(recent[["Steps_7d", "Steps_30d"]])
+    st.subheader("🗓️ Weekly Points")
+    st.bar_chart(stats.weekly["Points"].iloc[-12:])
+    st.subheader("✅ Habits (last 90 days)")
+    st.dataframe(habits.completion_table(df, data_manager.load_custom_activities(), days=90),
+                 width="stretch", hide_index=True)
+
+    # --- LOG (One Page at a Time) ---
+    # Only the visible page is sent to the browser, however long the history is.
+    st.subheader("📖 Log")
+    today = datetime.date.today()
+    c1, c2, c3 = st.columns([2, 1, 1])
+    date_range = c1.date_input("Dates", (today - datetime.timedelta(days=365), today), key="hist_range")
+    page_size = c2.selectbox("Rows", PAGE_SIZES, index=1, key="hist_page_size")
+    newest_first = c3.toggle("Newest first", value=True, key="hist_newest")
+
+    # The range picker returns a single date while the user is mid-selection
+    start, end = (date_range[0], date_range[-1]) if date_range else (None, None)
+    _, total = data_manager.get_history_page(start, end, page_size=1)
+    pages = max(math.ceil(total / page_size), 1)
+    if st.session_state.get("hist_page", 1) > pages:
+        st.session_state["hist_page"] = 1
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key="hist_page") - 1
+
+    rows, _ = data_manager.get_history_page(start, end, newest_first, page, page_size)
+    st.caption(f"{total} day(s) in range")
+    st.dataframe(rows, width="stretch", hide_index=True)
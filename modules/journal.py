@@ -0,0 +1,43 @@
+import json
+import os
+from modules.writer import FileLock
+
+# --- SET JOURNAL ---
+# During a workout each confirmed set is appended to a small JSON-lines
+# file and fsynced, which is much cheaper than a write to the reps store.
+# The journal is merged into the store in one batch at the end of the
+# workout. If the app dies first, the journal is still on disk and is
+# replayed the next time the user's data is opened.
+
+
+class SetJournal:
+    def __init__(self, path):
+        self.path = path
+
+    def lock(self):
+        """Held while appending or flushing, so a flush never drops a set being written."""
+        return FileLock(self.path)
+
+    def append(self, row):
+        line = json.dumps(row) + "\n"
+        with self.lock(), open(self.path, "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self):
+        """Journaled rows, oldest first. A torn last line (crash mid-write) is skipped."""
+        if not os.path.exists(self.path):
+            return []
+        rows = []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue
+        return rows
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
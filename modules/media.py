@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import threading
+import urllib.request
+
+# --- MEDIA CACHE ---
+# Exercise GIFs are stored once on disk under the SHA-256 of their content
+# (media_cache/objects/ab/abcdef....gif), with a small pre-generated
+# thumbnail next to them for the active screen. index.json maps each source
+# (the EXERCISE_DB URL) to its digest.
+#
+# Sources are looked up in this order:
+#   1. the cache index
+#   2. a local stand-in folder (media/), matched by the URL's file name,
+#      e.g. media/goblet-squat.gif for .../goblet-squat.gif
+#   3. a download, done on a background thread so a rerun never waits on it
+# Until a file is cached the original URL is returned, so the browser can
+# still show it when online. Once cached, workouts run fully offline.
+
+MEDIA_DIR = "media"
+CACHE_DIR = "media_cache"
+THUMB_WIDTH = 100
+FETCH_TIMEOUT = 10
+# Set LIFE_RPG_MEDIA_FETCH=0 to never touch the network (local files only)
+FETCH_REMOTE = os.environ.get("LIFE_RPG_MEDIA_FETCH", "1") != "0"
+
+_lock = threading.Lock()
+_index = None
+_pending = set()
+_bytes = {}  # path -> file contents, so reruns don't re-read the disk
+
+
+def _index_path():
+    return os.path.join(CACHE_DIR, "index.json")
+
+
+def _load_index():
+    global _index
+    if _index is None:
+        try:
+            with open(_index_path()) as f:
+                _index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            _index = {}
+    return _index
+
+
+def _save_index():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = _index_path() + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(_index, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, _index_path())
+
+
+def _ext(source):
+    return os.path.splitext(source.split("?")[0])[1].lower() or ".bin"
+
+
+def object_path(digest, ext):
+    return os.path.join(CACHE_DIR, "objects", digest[:2], digest + ext)
+
+
+def thumb_path(digest):
+    return os.path.join(CACHE_DIR, "thumbs", f"{digest}_w{THUMB_WIDTH}.gif")
+
+
+def _write_object(data, ext):
+    """Stores content under its hash (a no-op if it is already there)."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = object_path(digest, ext)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return digest
+
+
+def make_thumbnail(src, dest, width=THUMB_WIDTH):
+    """Resizes every frame of an image (animated or not) to `width` pixels wide."""
+    from PIL import Image, ImageSequence
+    with Image.open(src) as im:
+        height = max(1, round(im.height * width / im.width))
+        frames = [frame.convert("RGBA").resize((width, height)) for frame in ImageSequence.Iterator(im)]
+        duration = im.info.get("duration", 100)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp_path = dest + ".tmp"
+    frames[0].save(tmp_path, format="GIF", save_all=len(frames) > 1, append_images=frames[1:],
+                   duration=duration, loop=0, disposal=2)
+    os.replace(tmp_path, dest)
+
+
+def _local_source(source):
+    """A file in the stand-in folder with the same name as the URL's."""
+    if os.path.exists(source):
+        return source
+    candidate = os.path.join(MEDIA_DIR, os.path.basename(source.split("?")[0]))
+    return candidate if os.path.exists(candidate) else None
+
+
+def _read_source(source):
+    local = _local_source(source)
+    if local is not None:
+        with open(local, "rb") as f:
+            return f.read()
+    if FETCH_REMOTE and source.startswith(("http://", "https://")):
+        with urllib.request.urlopen(source, timeout=FETCH_TIMEOUT) as resp:
+            return resp.read()
+    return None
+
+
+def ingest(source):
+    """Copies a source into the cache and builds its thumbnail.
+    Returns the digest, or None if the source isn't available."""
+    try:
+        data = _read_source(source)
+    except OSError:
+        return None
+    if not data:
+        return None
+    ext = _ext(source)
+    digest = _write_object(data, ext)
+    if not os.path.exists(thumb_path(digest)):
+        try:
+            make_thumbnail(object_path(digest, ext), thumb_path(digest))
+        except Exception:
+            pass  # Not an image Pillow can read: the full file is used instead
+    with _lock:
+        _load_index()[source] = {"digest": digest, "ext": ext}
+        _save_index()
+    return digest
+
+
+def _cached(source):
+    with _lock:
+        entry = _load_index().get(source)
+    if entry is None:
+        return None
+    path = object_path(entry["digest"], entry["ext"])
+    return entry if os.path.exists(path) else None
+
+
+def _ensure(source, wait):
+    """The index entry for a source, ingesting it now (local files) or in the background."""
+    entry = _cached(source)
+    if entry is not None:
+        return entry
+    if wait or _local_source(source) is not None:
+        ingest(source)
+        return _cached(source)
+    prefetch(source)
+    return None
+
+
+def prefetch(source):
+    """Starts caching a source on a background thread (e.g. the next exercise during rest)."""
+    if not source or _cached(source) is not None:
+        return
+    with _lock:
+        if source in _pending:
+            return
+        _pending.add(source)
+
+    def run():
+        try:
+            digest = ingest(source)
+            if digest is not None:
+                entry = _cached(source)
+                _read_bytes(object_path(digest, entry["ext"]))
+                if os.path.exists(thumb_path(digest)):
+                    _read_bytes(thumb_path(digest))
+        finally:
+            with _lock:
+                _pending.discard(source)
+
+    threading.Thread(target=run, name="life-rpg-media", daemon=True).start()
+
+
+def _read_bytes(path):
+    data = _bytes.get(path)
+    if data is None:
+        with open(path, "rb") as f:
+            data = _bytes[path] = f.read()
+    return data
+
+
+def image(source):
+    """Full-size media for st.image: cached bytes, or the source URL until it is cached."""
+    if not source:
+        return None
+    entry = _ensure(source, wait=False)
+    if entry is None:
+        return source
+    return _read_bytes(object_path(entry["digest"], entry["ext"]))
+
+
+def thumbnail(source):
+    """THUMB_WIDTH-wide version of image(source)."""
+    if not source:
+        return None
+    entry = _ensure(source, wait=False)
+    if entry is None:
+        return source
+    path = thumb_path(entry["digest"])
+    if not os.path.exists(path):
+        return image(source)
+    return _read_bytes(path)
+
+
+def warm(sources):
+    """Caches every source now (blocking). Returns how many are available offline."""
+    return sum(_ensure(source, wait=True) is not None for source in sources if source)
+
+
+if __name__ == "__main__":
+    # Fill the cache ahead of time: python -m modules.media
+    from modules.workout import EXERCISE_DB
+    urls = [info["img"] for info in EXERCISE_DB.values()]
+    print(f"{warm(urls)}/{len(urls)} exercise images cached in {CACHE_DIR}/")
@@ -0,0 +1,133 @@
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import defaultdict
+
+# --- PROFILER (Developer Mode) ---
+# Per-rerun instrumentation: wall time per tab, CSV reads/writes with bytes,
+# and time spent in each data_manager call. Streamlit runs each session's
+# script on its own thread, so the current rerun's record is thread-local.
+# When no rerun is being profiled every hook is a cheap no-op.
+
+LOG_FILE = "profile_log.jsonl"
+
+_local = threading.local()
+_log = None
+
+
+class RerunRecord:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sections = {}
+        self.calls = defaultdict(lambda: [0, 0.0])  # name -> [count, seconds]
+        self.reads = 0
+        self.read_bytes = 0
+        self.writes = 0
+        self.write_bytes = 0
+        self.total = None
+
+    def as_dict(self):
+        return {
+            "total_ms": round((self.total or 0) * 1e3, 2),
+            "sections_ms": {k: round(v * 1e3, 2) for k, v in self.sections.items()},
+            "calls": {k: {"count": n, "ms": round(t * 1e3, 2)} for k, (n, t) in self.calls.items()},
+            "csv_reads": self.reads,
+            "csv_read_bytes": self.read_bytes,
+            "csv_writes": self.writes,
+            "csv_write_bytes": self.write_bytes,
+        }
+
+
+def current():
+    return getattr(_local, "record", None)
+
+
+def begin_rerun():
+    _local.record = RerunRecord()
+
+
+def end_rerun():
+    """Closes the current rerun and returns its record (or None if not profiling)."""
+    record = current()
+    if record is not None:
+        record.total = time.perf_counter() - record.started
+        _local.record = None
+    return record
+
+
+class section:
+    """Times a block of the script, e.g. one tab: `with profiler.section("History"):`."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record = current()
+        if record is not None:
+            record.sections[self.name] = record.sections.get(self.name, 0.0) + time.perf_counter() - self.t0
+
+
+def timed(fn):
+    """Adds a function's wall time to the current rerun's call table. Only the
+    outermost timed call counts, so a timed function calling another isn't
+    charged twice."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        record = current()
+        if record is None or getattr(_local, "in_call", False):
+            return fn(*args, **kwargs)
+        _local.in_call = True
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.in_call = False
+            stats = record.calls[fn.__name__]
+            stats[0] += 1
+            stats[1] += time.perf_counter() - t0
+    return wrapper
+
+
+def count_read(path):
+    record = current()
+    if record is not None:
+        record.reads += 1
+        try:
+            record.read_bytes += os.path.getsize(path)
+        except OSError:
+            pass
+
+
+def count_write(nbytes):
+    record = current()
+    if record is not None:
+        record.writes += 1
+        record.write_bytes += nbytes or 0
+
+
+def reruns_per_minute(stamps, now=None):
+    """Counts the rerun timestamps from the last 60 seconds."""
+    now = now or time.time()
+    return sum(1 for t in stamps if now - t <= 60)
+
+
+def log_record(record, extra=None):
+    """Appends one JSON line per rerun to a size-rotated log file."""
+    global _log
+    if _log is None:
+        _log = logging.getLogger("life_rpg.profile")
+        _log.setLevel(logging.INFO)
+        _log.propagate = False
+        handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=3)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _log.addHandler(handler)
+    entry = {"ts": time.time(), **record.as_dict(), **(extra or {})}
+    _log.info(json.dumps(entry))
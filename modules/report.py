@@ -0,0 +1,160 @@
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+from modules import data_manager, habits
+
+# --- REPORTS (command line) ---
+# Numbers from the history and reps without starting the app, e.g. from
+# cron on the NAS:
+#   python -m modules.report days --start 2025-01-01 --by week
+#   python -m modules.report reps --exercise Push-ups --by month --format json
+#   python -m modules.report habits --start 2025-01-01 --end 2025-03-31
+# Data is streamed from storage (see data_manager.iter_days/iter_reps), so
+# memory depends on the number of output rows, not on the history's size.
+# Results are written in chunks as CSV or JSON lines. Streamlit and pandas
+# are never imported. Sets still in a workout journal (a running or crashed
+# workout) are included but never committed: replaying it is up to the app.
+
+EPOCH = datetime.date(1970, 1, 1)
+CHUNK_ROWS = 1000
+DAY_FIELDS = ["Points", "Steps", "Sleep_Hours", "Workout_Done"]
+
+
+def period(date_str, by):
+    """The day, week (its Monday) or month a "YYYY-MM-DD..." string falls in."""
+    if by == "month":
+        return date_str[:7]
+    if by == "week":
+        day = datetime.date.fromisoformat(date_str[:10])
+        return (day - datetime.timedelta(days=day.weekday())).isoformat()
+    return date_str[:10]
+
+
+# --- REPORTS ---
+def days_report(start, end, by="day", fields=DAY_FIELDS):
+    """Per day: the chosen fields. Per week/month: days logged, total points
+    and steps, average sleep and workouts (as in the History tab's rollups).
+    Oldest first on every backend (a CSV history is kept in save order)."""
+    if by == "day":
+        rows = ({"Date": day["Date"], **{f: day.get(f) for f in fields}}
+                for day in data_manager.iter_days(start, end))
+        yield from sorted(rows, key=lambda row: row["Date"])
+        return
+    totals = {}
+    for day in data_manager.iter_days(start, end):
+        t = totals.setdefault(period(day["Date"], by), [0, 0, 0, 0.0, 0, 0])
+        t[0] += 1
+        t[1] += day.get("Points") or 0
+        t[2] += day.get("Steps") or 0
+        if day.get("Sleep_Hours") is not None:
+            t[3] += day["Sleep_Hours"]
+            t[4] += 1
+        t[5] += bool(day.get("Workout_Done"))
+    for key in sorted(totals):
+        logged, points, steps, sleep, sleep_days, workouts = totals[key]
+        yield {"Period": key, "Days_Logged": logged, "Points": points, "Steps": steps,
+               "Sleep_Hours": round(sleep / sleep_days, 2) if sleep_days else None, "Workouts": workouts}
+
+
+def reps_report(start, end, by="week", exercises=None):
+    """Rep progression: sets, total and best set per exercise and period."""
+    wanted = set(exercises) if exercises else None
+    totals = {}
+    for s in data_manager.iter_reps(start, end):
+        if wanted is not None and s["Exercise"] not in wanted:
+            continue
+        t = totals.setdefault((s["Exercise"], period(s["Timestamp"].isoformat(), by)), [0, 0, 0])
+        t[0] += 1
+        t[1] += s["Reps"]
+        t[2] = max(t[2], s["Reps"])
+    for (exercise, key), (sets, total, best) in sorted(totals.items()):
+        yield {"Exercise": exercise, "Period": key, "Sets": sets, "Total_Reps": total,
+               "Best_Set": best, "Avg_Reps": round(total / sets, 2)}
+
+
+def habits_report(start, end):
+    """Days each custom habit was done, and its rate per logged day."""
+    activities = data_manager.get_activities()
+    done = dict.fromkeys(activities.ids, 0)
+    logged = 0
+    for day in data_manager.iter_days(start, end):
+        logged += 1
+        mask = habits.day_mask(day, activities.ids)
+        for name, act_id in activities.ids.items():
+            done[name] += mask >> act_id & 1
+    for a in activities.items:
+        yield {"Activity": a["Activity"], "ID": a["ID"], "Points": a["Points"],
+               "Days_Done": done[a["Activity"]], "Days_Logged": logged,
+               "Rate": round(done[a["Activity"]] / logged, 3) if logged else None}
+
+
+# --- OUTPUT ---
+def write(rows, out, fmt="csv", chunk=CHUNK_ROWS):
+    """Writes report rows as CSV or JSON lines, flushing every `chunk` rows.
+    Returns the number of rows written."""
+    buffer, count, csv_out = [], 0, None
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= chunk:
+            csv_out = _flush(buffer, out, fmt, csv_out)
+            count += len(buffer)
+            buffer = []
+    if buffer:
+        _flush(buffer, out, fmt, csv_out)
+        count += len(buffer)
+    return count
+
+
+def _flush(buffer, out, fmt, csv_out):
+    if fmt == "json":
+        out.write("".join(json.dumps(row, default=str) + "\n" for row in buffer))
+    else:
+        if csv_out is None:
+            csv_out = csv.DictWriter(out, fieldnames=list(buffer[0]), lineterminator="\n")
+            csv_out.writeheader()
+        csv_out.writerows(buffer)
+    out.flush()
+    return csv_out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.report",
+                                     description="Life RPG reports as CSV or JSON lines, without the app.")
+    parser.add_argument("report", choices=["days", "reps", "habits"])
+    parser.add_argument("--start", type=datetime.date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=datetime.date.fromisoformat, help="last day (default: today)")
+    parser.add_argument("--by", choices=["day", "week", "month"], help="period (days: day, reps: week)")
+    parser.add_argument("--exercise", action="append", help="only this exercise (repeatable)")
+    parser.add_argument("--fields", nargs="+", default=DAY_FIELDS, help="day fields for --by day")
+    parser.add_argument("--user", help="player name (default: the shared data)")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows per write")
+    parser.add_argument("--out", help="write here instead of stdout")
+    args = parser.parse_args(argv)
+
+    start, end = args.start or EPOCH, args.end or datetime.date.today()
+    try:
+        with data_manager.as_user(data_manager.existing_user(args.user)):
+            if args.report == "days":
+                rows = days_report(start, end, args.by or "day", args.fields)
+            elif args.report == "reps":
+                rows = reps_report(start, end, args.by or "week", args.exercise)
+            else:
+                rows = habits_report(start, end)
+            if args.out:
+                with open(args.out, "w", newline="") as out:
+                    write(rows, out, args.format, args.chunk)
+            else:
+                write(rows, sys.stdout, args.format, args.chunk)
+    except ValueError as e:
+        parser.error(str(e))
+    except BrokenPipeError:
+        # The reader stopped early (e.g. piped into head): exit quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+if __name__ == "__main__":
+    main()
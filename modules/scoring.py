@@ -0,0 +1,166 @@
+import ast
+
+# numpy is only imported by the vectorized (whole-history) functions, so
+# scoring a single day in the Daily Log stays lightweight.
+
+# --- SCORING TABLE ---
+# Every point rule in one place. Each rule reads one saved field:
+#   between: points if low <= value <= high
+#   below:   points if value < limit
+#   equals:  points if value == match
+#   flag:    points if the box was ticked
+#   per:     points for every whole `unit` of the value
+# Flag rules carry the checkbox label shown in the Daily Log.
+SCORING_RULES = [
+    # Sleep
+    {"category": "Sleep", "field": "Sleep_Hours", "kind": "between", "low": 7, "high": 9, "points": 30},
+    {"category": "Sleep", "field": "Sleep_Hours", "kind": "below", "limit": 6, "points": -10},
+    {"category": "Sleep", "field": "Wake_Mood", "kind": "equals", "match": "Energized", "points": 20},
+    {"category": "Sleep", "field": "Wake_Mood", "kind": "equals", "match": "Groggy", "points": -10},
+    # Nutrition
+    {"category": "Nutrition", "field": "Fruit", "kind": "flag", "label": "🍎 Fruit", "points": 10},
+    {"category": "Nutrition", "field": "Veg", "kind": "flag", "label": "🥕 Veg", "points": 10},
+    {"category": "Nutrition", "field": "Protein", "kind": "flag", "label": "🥤 Protein", "points": 5},
+    # Movement
+    {"category": "Movement", "field": "Steps", "kind": "per", "unit": 100, "points": 1},
+    {"category": "Workout", "field": "Workout_Done", "kind": "flag", "label": "Base Workout", "points": 50},
+    {"category": "Side Quests", "field": "SQ_Swim", "kind": "flag", "label": "Swim Prep", "points": 20},
+    {"category": "Side Quests", "field": "SQ_Calisthenics", "kind": "flag", "label": "Calisthenics", "points": 20},
+    {"category": "Side Quests", "field": "SQ_Abs", "kind": "flag", "label": "Abs", "points": 20},
+    # Life & Study
+    {"category": "Study", "field": "Study_Mins", "kind": "per", "unit": 1, "points": 1},
+    {"category": "Bonuses", "field": "Bonus_Driving", "kind": "flag", "label": "🚗 Driving Lesson", "points": 20},
+    {"category": "Bonuses", "field": "Bonus_Motorbike", "kind": "flag", "label": "🏍️ Motorbike Lesson", "points": 20},
+    {"category": "Bonuses", "field": "Bonus_Errand", "kind": "flag", "label": "🛒 Errand/Medical", "points": 15},
+    {"category": "Bonuses", "field": "Bonus_Exam", "kind": "flag", "label": "🎓 Exam Success", "points": 50},
+]
+
+# Custom habits are scored from custom_activities.csv, not from this table
+HABITS = "Habits"
+
+CATEGORIES = list(dict.fromkeys(r["category"] for r in SCORING_RULES)) + [HABITS]
+
+# Checkbox fields that were only itemized in storage once this engine existed.
+# Older rows only kept the nutrition total (Food_Bonus).
+ITEMIZED_FIELDS = [r["field"] for r in SCORING_RULES
+                   if r["kind"] == "flag" and r["field"] != "Workout_Done"]
+
+
+def flag_rules(category):
+    """The checkbox rules of one category, in table order."""
+    return [r for r in SCORING_RULES if r["category"] == category and r["kind"] == "flag"]
+
+
+def parse_activity_list(value):
+    """Reads a stored Custom_Activities value (str(list)) back into a list."""
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if not isinstance(value, str) or not value:
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+    return list(parsed) if isinstance(parsed, (list, tuple)) else []
+
+
+# --- ENGINE ---
+def _rule_value(rule, value):
+    """Points for one rule and a single value."""
+    kind = rule["kind"]
+    if kind == "equals":
+        return rule["points"] if value == rule["match"] else 0
+    if value is None or value != value:
+        return 0
+    if kind == "flag":
+        return rule["points"] if value else 0
+    number = float(value)
+    if kind == "per":
+        return int(number / rule["unit"]) * rule["points"]
+    if kind == "between":
+        return rule["points"] if rule["low"] <= number <= rule["high"] else 0
+    if kind == "below":
+        return rule["points"] if number < rule["limit"] else 0
+    raise ValueError(f"Unknown rule kind: {kind}")
+
+
+def _rule_points(rule, values):
+    """Vectorized points for one rule over an array of field values."""
+    import numpy as np
+    kind = rule["kind"]
+    if kind == "equals":
+        hit = values == rule["match"]
+    elif kind == "flag":
+        hit = np.nan_to_num(values.astype(float)) != 0
+    else:
+        raw = values.astype(float)
+        numbers = np.nan_to_num(raw)
+        if kind == "per":
+            return np.trunc(numbers / rule["unit"]).astype(np.int64) * rule["points"]
+        # A missing value scores nothing (as in _rule_value), not as zero
+        if kind == "between":
+            hit = (raw >= rule["low"]) & (raw <= rule["high"])
+        elif kind == "below":
+            hit = raw < rule["limit"]
+        else:
+            raise ValueError(f"Unknown rule kind: {kind}")
+    return np.where(hit, rule["points"], 0)
+
+
+def _score_columns(columns, habit_points, n):
+    import numpy as np
+    breakdown = {cat: np.zeros(n, dtype=np.int64) for cat in CATEGORIES}
+    for rule in SCORING_RULES:
+        values = columns.get(rule["field"])
+        if values is None:
+            continue
+        breakdown[rule["category"]] += _rule_points(rule, values)
+    breakdown[HABITS] += habit_points
+    return breakdown
+
+
+def score_day(values, custom_points):
+    """Scores one day. `values` maps field names to widget values and
+    Custom_Activities to the list of ticked habits.
+    Returns (total, {category: points})."""
+    breakdown = dict.fromkeys(CATEGORIES, 0)
+    for rule in SCORING_RULES:
+        if rule["field"] in values:
+            breakdown[rule["category"]] += _rule_value(rule, values[rule["field"]])
+    breakdown[HABITS] = sum(custom_points.get(a, 0) for a in parse_activity_list(values.get("Custom_Activities")))
+    return sum(breakdown.values()), breakdown
+
+
+def score_frame(df, habit_points):
+    """Scores every row of a history dataframe in one pass. `habit_points`
+    is the per-row custom habit total (see habits.habit_points).
+    Returns a frame with one column per category plus the Points total.
+
+    Rows saved before the checkboxes were itemized fall back to their
+    stored Food_Bonus for nutrition."""
+    import numpy as np
+    n = len(df)
+    fields = {r["field"] for r in SCORING_RULES}
+    columns = {col: df[col].to_numpy(dtype=object, na_value=np.nan) for col in df.columns if col in fields}
+
+    breakdown = _score_columns(columns, np.asarray(habit_points, dtype=np.int64), n)
+
+    legacy = ~itemized_mask(df)
+    if legacy.any() and "Food_Bonus" in df.columns:
+        food = np.nan_to_num(df["Food_Bonus"].to_numpy(dtype=float)).astype(np.int64)
+        breakdown["Nutrition"] = np.where(legacy, food, breakdown["Nutrition"])
+
+    out = {cat: breakdown[cat] for cat in CATEGORIES}
+    out["Points"] = np.sum(list(breakdown.values()), axis=0) if n else np.zeros(0, dtype=np.int64)
+    return df[[]].assign(**out)
+
+
+def itemized_mask(df):
+    """True for rows that stored every checkbox, so they can be fully re-scored."""
+    import numpy as np
+    mask = np.ones(len(df), dtype=bool)
+    for field in ITEMIZED_FIELDS:
+        if field not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        mask &= df[field].notna().to_numpy()
+    return mask
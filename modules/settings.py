@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from modules import data_manager
 
 def render_settings_tab():
@@ -19,11 +18,13 @@ def render_settings_tab():
         submitted = st.form_submit_button("Add Activity")
         
         if submitted and new_name:
-            new_row = {"Activity": new_name, "Points": new_pts}
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            data_manager.save_custom_activities(df)
-            st.success(f"Added {new_name}!")
-            st.rerun()
+            try:
+                df = data_manager.add_custom_activity(df, new_name, new_pts)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.success(f"Added {new_name}!")
+                st.rerun()
 
     # Delete Existing
     st.divider()
@@ -33,4 +34,60 @@ def render_settings_tab():
         data_manager.save_custom_activities(df)
         st.success("Deleted!")
         st.rerun()
-      
+
+    # Re-score History
+    st.divider()
+    st.caption("Changed an activity's points? Apply the current rules to every saved day.")
+    if st.button("🔁 Recalculate All Points"):
+        changed = data_manager.rescore_history()
+        st.success(f"Updated {changed} day(s).")
+
+    # Backup
+    st.divider()
+    with st.expander("💾 Backup"):
+        st.caption(f"Only what changed since the last backup is copied to `{data_manager.mirror_dir()}/`.")
+        if st.button("Back up now"):
+            try:
+                entry = data_manager.backup()
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.success("Nothing changed since the last backup." if entry is None else
+                           f"Saved {entry['file']} ({entry['bytes'] / 1024:.1f} KB).")
+        if st.checkbox("Replace my data with the latest backup") and st.button("Restore"):
+            try:
+                seq = data_manager.restore_backup()
+            except (OSError, ValueError) as e:
+                st.error(f"Couldn't restore: {e}")
+            else:
+                st.success(f"Restored backup #{seq}.")
+
+    # Export / Import
+    st.divider()
+    with st.expander("📦 Export & Import"):
+        fmt = st.radio("Export format", ["parquet", "arrow"], horizontal=True)
+        if st.button("Export history & reps"):
+            try:
+                days, sets = data_manager.export_columnar(fmt=fmt)
+            except ImportError as e:
+                st.error(str(e))
+            else:
+                st.success(f"Exported {days} day(s) and {sets} set(s) to `{data_manager.export_dir()}/`.")
+
+        st.caption("Merge a step/sleep export from another tracker (CSV). It is read in chunks, so large files are fine.")
+        upload = st.file_uploader("Tracker export", type="csv")
+        if upload is not None:
+            c1, c2, c3 = st.columns(3)
+            date_col = c1.text_input("Date/time column", "date")
+            steps_col = c2.text_input("Steps column (summed per day)", "steps")
+            sleep_col = c3.text_input("Sleep hours column (optional)", "")
+            if st.button("Import"):
+                fields = {"Steps": (steps_col, "sum")} if steps_col else {}
+                if sleep_col:
+                    fields["Sleep_Hours"] = (sleep_col, "sum")
+                try:
+                    touched = data_manager.import_tracker_export(upload, date_col, fields)
+                except ValueError as e:
+                    st.error(f"Couldn't read that file: {e}")
+                else:
+                    st.success(f"Updated {touched} day(s).")
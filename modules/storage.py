@@ -0,0 +1,480 @@
+import csv
+import os
+import datetime
+import sqlite3
+import threading
+from modules import profiler, scoring, writer
+
+# pandas is imported inside the methods that need it, so reading or saving
+# a single day (the Daily Log path) works without loading it.
+
+# --- SCHEMA ---
+HISTORY_COLUMNS = ["Date", "Points", "Steps", "Sleep_Hours", "Wake_Mood",
+                   "Workout_Done", "Food_Bonus", "Study_Mins", "Custom_Notes", "Custom_Activities"]
+REPS_COLUMNS = ["Timestamp", "Exercise", "Reps"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Field types for reading a day without pandas (CSV cells are strings)
+INT_FIELDS = {"Points", "Steps", "Food_Bonus", "Study_Mins", "Custom_Mask"}
+FLOAT_FIELDS = {"Sleep_Hours"}
+BOOL_FIELDS = {"Workout_Done", *scoring.ITEMIZED_FIELDS}
+
+
+def _convert(field, value):
+    if value is None or value == "":
+        return None
+    if field in BOOL_FIELDS:
+        return value in ("True", "true", "1", "1.0") if isinstance(value, str) else bool(value)
+    if field in INT_FIELDS:
+        try:
+            return int(value)
+        except ValueError:
+            return int(float(value))  # "7.0": pandas wrote the column as floats
+    if field in FLOAT_FIELDS:
+        return float(value)
+    return value
+
+
+def file_stamp(path):
+    """Identifies one version of a file, or None if it doesn't exist. Atomic
+    rewrites swap in a new inode, so the stamp changes even when a save keeps
+    the size and lands within a coarse mtime tick (e.g. a NAS share)."""
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (info.st_ino, info.st_ctime_ns, info.st_mtime_ns, info.st_size)
+
+
+def parse_day_row(row):
+    """Typed day dict from raw values (CSV strings or SQLite cells)."""
+    return {field: _convert(field, value) for field, value in row.items()}
+
+
+def empty_history():
+    import pandas as pd
+    return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+
+def empty_reps():
+    import pandas as pd
+    return pd.DataFrame(columns=REPS_COLUMNS)
+
+
+def time_bounds(start, end):
+    """Dates/datetimes -> inclusive start and exclusive end timestamp strings.
+    A date `end` means the whole of that day."""
+    if not isinstance(start, datetime.datetime):
+        start = datetime.datetime.combine(start, datetime.time())
+    if not isinstance(end, datetime.datetime):
+        end = datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time())
+    return start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT)
+
+
+def parse_set(timestamp, exercise, reps):
+    return {"Timestamp": datetime.datetime.fromisoformat(timestamp), "Exercise": exercise, "Reps": int(reps)}
+
+
+def _months(lo, hi):
+    """"YYYY-MM" keys from the month of lo up to the month of hi."""
+    year, month = int(lo[:4]), int(lo[5:7])
+    last = hi[:7]
+    while True:
+        key = f"{year:04d}-{month:02d}"
+        if key > last:
+            return
+        yield key
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+# --- CSV BACKEND (Default) ---
+class CsvBackend:
+    """The original flat-file storage: one CSV for days, and reps split into
+    one CSV per month (reps_history/2025-03.csv), so a date range only
+    reads the months it covers. A single legacy reps file is split up the
+    first time reps are accessed, and kept as reps_file + ".bak"."""
+
+    name = "csv"
+
+    def __init__(self, data_file, reps_file, coordinator=None):
+        self.data_file = data_file
+        self.reps_file = reps_file
+        self.reps_dir = os.path.splitext(reps_file)[0]
+        # Writes are queued to the shared writer thread (locked, atomic, batched)
+        self.writer = coordinator or writer.get_coordinator()
+        self._partitioned = False
+        self._appends = 0
+
+    def history_stamp(self):
+        """Changes whenever the history file is rewritten."""
+        return file_stamp(self.data_file)
+
+    def load_history(self):
+        """Typed history frame (see modules.compact), memory-mapped from the
+        .npy cache when the CSV hasn't changed since it was written."""
+        if os.path.exists(self.data_file):
+            from modules import compact
+            return compact.read_csv(self.data_file, self.history_stamp())
+        return empty_history()
+
+    def load_days(self):
+        """Date -> typed day dict, read with the csv module (no pandas)."""
+        if os.path.exists(self.data_file):
+            profiler.count_read(self.data_file)
+        header, rows = writer.read_rows(self.data_file)
+        if "Date" not in header:
+            return {}
+        date_col = header.index("Date")
+        return {row[date_col]: parse_day_row(dict(zip(header, row))) for row in rows}
+
+    def get_day(self, date_str):
+        """One typed day dict (or None). Only lines containing the date are
+        CSV-parsed, wherever the Date column is."""
+        if not os.path.exists(self.data_file):
+            return None
+        profiler.count_read(self.data_file)
+        with open(self.data_file, newline="") as f:
+            header = next(csv.reader([f.readline()]), [])
+            if "Date" not in header:
+                return None
+            date_col = header.index("Date")
+            for line in f:
+                if date_str in line:
+                    row = next(csv.reader([line]))
+                    # (a line inside a quoted multi-line note has the wrong width)
+                    if len(row) == len(header) and row[date_col] == date_str:
+                        return parse_day_row(dict(zip(header, row)))
+        return None
+
+    def iter_days(self, start=None, end=None):
+        """Typed day dicts with start <= Date <= end ("YYYY-MM-DD", None = open),
+        streamed row by row in file order."""
+        if not os.path.exists(self.data_file):
+            return
+        profiler.count_read(self.data_file)
+        with open(self.data_file, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if "Date" not in header:
+                return
+            date_col = header.index("Date")
+            for row in reader:
+                if (start is None or row[date_col] >= start) and (end is None or row[date_col] <= end):
+                    yield parse_day_row(dict(zip(header, row)))
+
+    def save_day(self, date_str, data_dict):
+        # Replaces any existing row for this date (Date is the first column of a new file)
+        row = {"Date": date_str, **data_dict}
+        self.writer.upsert(self.data_file, "Date", row)
+
+    def replace_history(self, df):
+        """Writes a whole history frame back in one go (bulk re-scoring)."""
+        self.writer.replace(self.data_file, df)
+
+    # --- Reps (month partitions) ---
+    def _partition(self, month):
+        return os.path.join(self.reps_dir, month + ".csv")
+
+    def _ensure_partitions(self):
+        """Splits a legacy single reps file into month files (once)."""
+        if self._partitioned:
+            return
+        with writer.FileLock(self.reps_file):
+            if os.path.exists(self.reps_file):
+                header, rows = writer.read_rows(self.reps_file)
+                by_month = {}
+                if "Timestamp" in header:
+                    ts_col = header.index("Timestamp")
+                    for row in rows:
+                        by_month.setdefault(row[ts_col][:7], []).append(row)
+                os.makedirs(self.reps_dir, exist_ok=True)
+                for month, month_rows in by_month.items():
+                    path = self._partition(month)
+                    old_header, old_rows = writer.read_rows(path)
+                    writer.atomic_write_rows(header, old_rows + month_rows, path)
+                os.replace(self.reps_file, self.reps_file + ".bak")
+        self._partitioned = True
+
+    def _partition_files(self):
+        self._ensure_partitions()
+        try:
+            names = sorted(n for n in os.listdir(self.reps_dir) if n.endswith(".csv") and len(n) == 11)
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.reps_dir, n) for n in names]
+
+    def reps_stamp(self):
+        """Changes when a month file is added, this month's file grows, or this
+        backend appends to any month. Cheap: two stats, not one per month."""
+        self._ensure_partitions()
+        try:
+            folder = os.stat(self.reps_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        newest = self._partition(datetime.date.today().strftime("%Y-%m"))
+        try:
+            info = os.stat(newest)
+            newest_stamp = (info.st_mtime_ns, info.st_size)
+        except FileNotFoundError:
+            newest_stamp = None
+        return (folder, newest_stamp, self._appends)
+
+    def load_reps(self):
+        import pandas as pd
+        paths = self._partition_files()
+        if not paths:
+            return empty_reps()
+        for path in paths:
+            profiler.count_read(path)
+        return pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+
+    def reps_between(self, start, end):
+        """Every set from start to end (dates inclusive, or datetimes with an
+        exclusive end), oldest first, reading only the months in range."""
+        self._ensure_partitions()
+        lo, hi = time_bounds(start, end)
+        sets = []
+        for month in _months(lo, hi):
+            path = self._partition(month)
+            if not os.path.exists(path):
+                continue
+            profiler.count_read(path)
+            header, rows = writer.read_rows(path)
+            ts, ex, reps = (header.index(c) for c in REPS_COLUMNS)
+            sets.extend(parse_set(r[ts], r[ex], r[reps]) for r in rows if lo <= r[ts] < hi)
+        sets.sort(key=lambda s: s["Timestamp"])
+        return sets
+
+    def iter_reps(self, start, end):
+        """Like reps_between, streamed row by row (oldest month first, file
+        order within a month) instead of collected and sorted."""
+        self._ensure_partitions()
+        lo, hi = time_bounds(start, end)
+        for month in _months(lo, hi):
+            path = self._partition(month)
+            if not os.path.exists(path):
+                continue
+            profiler.count_read(path)
+            with open(path, newline="") as f:
+                reader = csv.reader(f)
+                header = next(reader, [])
+                ts, ex, reps = (header.index(c) for c in REPS_COLUMNS)
+                for r in reader:
+                    if lo <= r[ts] < hi:
+                        yield parse_set(r[ts], r[ex], r[reps])
+
+    def append_reps(self, timestamp, exercise_name, reps_count):
+        self.append_reps_batch([{"Timestamp": timestamp, "Exercise": exercise_name, "Reps": reps_count}])
+
+    def append_reps_batch(self, rows):
+        # Reps are append-only, so a month file is never rewritten
+        self._ensure_partitions()
+        os.makedirs(self.reps_dir, exist_ok=True)
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(str(row["Timestamp"])[:7], []).append(row)
+        for month, month_rows in by_month.items():
+            self.writer.append(self._partition(month), month_rows)
+        self._appends += 1
+
+
+# --- SQLITE BACKEND ---
+class SqliteBackend:
+    """Embedded SQLite storage. Saves touch one row instead of rewriting a file."""
+
+    name = "sqlite"
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        # Streamlit serves sessions from several threads, so share one
+        # connection behind a lock rather than pinning it to a thread.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS history (
+                    Date TEXT PRIMARY KEY,
+                    Points INTEGER,
+                    Steps INTEGER,
+                    Sleep_Hours REAL,
+                    Wake_Mood TEXT,
+                    Workout_Done INTEGER,
+                    Food_Bonus INTEGER,
+                    Study_Mins INTEGER,
+                    Custom_Notes TEXT,
+                    Custom_Activities TEXT
+                )""")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS reps (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    Timestamp TEXT NOT NULL,
+                    Exercise TEXT NOT NULL,
+                    Reps INTEGER NOT NULL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reps_exercise_ts ON reps (Exercise, Timestamp)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reps_ts ON reps (Timestamp)")
+
+    def _history_columns(self):
+        return [r[1] for r in self._conn.execute("PRAGMA table_info(history)")]
+
+    def _ensure_columns(self, keys):
+        """New fields in a day's data become new nullable columns."""
+        existing = set(self._history_columns())
+        for key in keys:
+            if key not in existing:
+                self._conn.execute(f'ALTER TABLE history ADD COLUMN "{key}"')
+
+    def is_empty(self):
+        with self._lock:
+            days = self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            sets = self._conn.execute("SELECT COUNT(*) FROM reps").fetchone()[0]
+        return days == 0 and sets == 0
+
+    def history_stamp(self):
+        """data_version moves on writes from other connections, total_changes on ours."""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return (data_version, self._conn.total_changes)
+
+    def load_history(self):
+        import pandas as pd
+        with self._lock:
+            df = pd.read_sql_query("SELECT * FROM history", self._conn)
+        if df.empty:
+            return df
+        from modules import compact
+        return compact.typed(df)
+
+    def load_days(self):
+        with self._lock:
+            cur = self._conn.execute("SELECT * FROM history")
+            columns = [c[0] for c in cur.description]
+            rows = cur.fetchall()
+        return {row[0]: parse_day_row(dict(zip(columns, row))) for row in rows}
+
+    def iter_days(self, start=None, end=None, page_size=1000):
+        """Day dicts in Date order, fetched a page at a time."""
+        after = ""
+        while True:
+            with self._lock:
+                cur = self._conn.execute(
+                    "SELECT * FROM history WHERE Date > ? AND Date >= ? AND Date <= ? ORDER BY Date LIMIT ?",
+                    (after, start or "", end or "9999-12-31", page_size))
+                columns = [c[0] for c in cur.description]
+                rows = cur.fetchall()
+            for row in rows:
+                yield parse_day_row(dict(zip(columns, row)))
+            if len(rows) < page_size:
+                return
+            after = rows[-1][0]
+
+    def get_day(self, date_str):
+        with self._lock:
+            cur = self._conn.execute("SELECT * FROM history WHERE Date = ?", (date_str,))
+            row = cur.fetchone()
+            columns = [c[0] for c in cur.description]
+        if row is None:
+            return None
+        return parse_day_row(dict(zip(columns, row)))
+
+    def save_day(self, date_str, data_dict):
+        row = dict(data_dict, Date=date_str)
+        if 'Workout_Done' in row:
+            row['Workout_Done'] = int(bool(row['Workout_Done']))
+        cols = list(row.keys())
+        quoted = ", ".join(f'"{c}"' for c in cols)
+        marks = ", ".join("?" for _ in cols)
+        updates = ", ".join(f'"{c}" = excluded."{c}"' for c in cols if c != "Date")
+        with self._lock, self._conn:
+            self._ensure_columns(cols)
+            self._conn.execute(
+                f"INSERT INTO history ({quoted}) VALUES ({marks}) "
+                f"ON CONFLICT(Date) DO UPDATE SET {updates}",
+                [row[c] for c in cols])
+
+    def reps_stamp(self):
+        """Reps are append-only, so the newest row id identifies the table state."""
+        with self._lock:
+            return self._conn.execute("SELECT MAX(id) FROM reps").fetchone()[0]
+
+    def load_reps(self):
+        import pandas as pd
+        with self._lock:
+            return pd.read_sql_query("SELECT Timestamp, Exercise, Reps FROM reps ORDER BY id", self._conn)
+
+    def append_reps(self, timestamp, exercise_name, reps_count):
+        self.append_reps_batch([{"Timestamp": timestamp, "Exercise": exercise_name, "Reps": reps_count}])
+
+    def append_reps_batch(self, rows):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO reps (Timestamp, Exercise, Reps) VALUES (?, ?, ?)",
+                ((r["Timestamp"], r["Exercise"], int(r["Reps"])) for r in rows))
+
+    def reps_between(self, start, end):
+        """Every set in the range (see CsvBackend.reps_between), from the Timestamp index."""
+        lo, hi = time_bounds(start, end)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT Timestamp, Exercise, Reps FROM reps WHERE Timestamp >= ? AND Timestamp < ? "
+                "ORDER BY Timestamp, id", (lo, hi)).fetchall()
+        return [parse_set(*row) for row in rows]
+
+    def iter_reps(self, start, end, page_size=5000):
+        """Like reps_between, fetched a page at a time (in insertion order)."""
+        lo, hi = time_bounds(start, end)
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, Timestamp, Exercise, Reps FROM reps WHERE id > ? AND Timestamp >= ? "
+                    "AND Timestamp < ? ORDER BY id LIMIT ?", (last_id, lo, hi, page_size)).fetchall()
+            for row in rows:
+                yield parse_set(*row[1:])
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+
+    def _write_history_rows(self, history_df):
+        history_df = history_df.copy()
+        if 'Date' in history_df.columns and history_df['Date'].dtype.kind == "M":
+            history_df['Date'] = history_df['Date'].dt.strftime("%Y-%m-%d")
+        if 'Workout_Done' in history_df.columns:
+            history_df['Workout_Done'] = history_df['Workout_Done'].fillna(False).astype(bool).astype(int)
+        history_df = history_df.astype(object).where(history_df.notna(), None)
+        cols = list(history_df.columns)
+        quoted = ", ".join(f'"{c}"' for c in cols)
+        marks = ", ".join("?" for _ in cols)
+        self._ensure_columns(cols)
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO history ({quoted}) VALUES ({marks})",
+            history_df.itertuples(index=False, name=None))
+
+    def replace_history(self, df):
+        """Writes a whole history frame back in one transaction (bulk re-scoring)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history")
+            self._write_history_rows(df)
+
+    def import_frames(self, history_df, reps_df):
+        """Bulk-loads dataframes (used by the CSV migration)."""
+        with self._lock, self._conn:
+            self._write_history_rows(history_df)
+            self._conn.executemany(
+                "INSERT INTO reps (Timestamp, Exercise, Reps) VALUES (?, ?, ?)",
+                ((str(t), str(e), int(r)) for t, e, r in reps_df[REPS_COLUMNS].itertuples(index=False, name=None)))
+
+
+def migrate_csv_to_sqlite(csv_backend, sqlite_backend):
+    """One-shot copy of the CSV files into an empty SQLite database.
+    Returns (days, sets) imported, or None if the database already has data."""
+    if not sqlite_backend.is_empty():
+        return None
+    history_df = csv_backend.load_history()
+    reps_df = csv_backend.load_reps()
+    sqlite_backend.import_frames(history_df, reps_df)
+    return len(history_df), len(reps_df)
@@ -0,0 +1,115 @@
+import datetime
+import json
+import os
+
+# --- SUMMARY RECORD ---
+# Headline numbers (last workout, lifetime totals, best day, streaks) kept
+# in one small dict. save_day updates it in O(1) when the newest day is
+# saved; editing an older day, or a change that can't be applied forward
+# (un-ticking the last workout, lowering the best day), rebuilds it from
+# the day dicts. It is also saved to summary.json, so a restart doesn't
+# need a full scan while the history file is unchanged.
+
+EMPTY = {
+    "days_logged": 0,
+    "total_points": 0,
+    "lifetime_steps": 0,
+    "workout_days": 0,
+    "best_day": None,
+    "best_points": None,
+    "last_day": None,
+    "last_workout": None,
+    "streak_end": None,   # last day of the most recent run of workout days
+    "streak_len": 0,
+    "longest_streak": 0,
+}
+
+
+def _num(value):
+    return value if value is not None and value == value else 0
+
+
+def _next_day(date_str):
+    return (datetime.date.fromisoformat(date_str) + datetime.timedelta(days=1)).isoformat()
+
+
+def _add_day(record, date_str, day):
+    """Folds one day (newer than every day already counted) into the record."""
+    record["days_logged"] += 1
+    record["total_points"] += _num(day.get("Points"))
+    record["lifetime_steps"] += _num(day.get("Steps"))
+    record["last_day"] = date_str
+    points = day.get("Points")
+    if points is not None and points == points and (record["best_points"] is None or points > record["best_points"]):
+        record["best_day"], record["best_points"] = date_str, points
+    if day.get("Workout_Done"):
+        record["workout_days"] += 1
+        record["last_workout"] = date_str
+        if record["streak_end"] is not None and _next_day(record["streak_end"]) == date_str:
+            record["streak_len"] += 1
+        else:
+            record["streak_len"] = 1
+        record["streak_end"] = date_str
+        record["longest_streak"] = max(record["longest_streak"], record["streak_len"])
+
+
+def build(days):
+    """Full rebuild from {date_str: day dict}."""
+    record = dict(EMPTY)
+    for date_str in sorted(days):
+        _add_day(record, date_str, days[date_str])
+    return record
+
+
+def apply_save(record, date_str, old, new):
+    """Updates the record for one saved day in place. `old` is the day as it
+    was before (None if new). Returns False when a rebuild is needed instead."""
+    if record["last_day"] is not None and date_str < record["last_day"]:
+        return False  # a past day: totals could be patched, streaks and bests can't
+    if old is None:
+        _add_day(record, date_str, new)
+        return True
+    # Re-saving the newest day: drop its old values, then add the new ones
+    if old.get("Workout_Done") and not new.get("Workout_Done"):
+        return False
+    if record["best_day"] == date_str and _num(new.get("Points")) < _num(old.get("Points")):
+        return False
+    record["days_logged"] -= 1
+    record["total_points"] -= _num(old.get("Points"))
+    record["lifetime_steps"] -= _num(old.get("Steps"))
+    if old.get("Workout_Done"):
+        # Undo this day's place in the streak, _add_day puts it back
+        record["workout_days"] -= 1
+        record["streak_len"] -= 1
+        record["streak_end"] = (datetime.date.fromisoformat(date_str) - datetime.timedelta(days=1)).isoformat() \
+            if record["streak_len"] else None
+    _add_day(record, date_str, new)
+    return True
+
+
+def current_streak(record, today=None):
+    """Workout days in a row ending today (or yesterday, if today isn't done yet)."""
+    today = today or datetime.date.today()
+    if record["streak_end"] is None:
+        return 0
+    end = datetime.date.fromisoformat(record["streak_end"])
+    return record["streak_len"] if (today - end).days <= 1 else 0
+
+
+def load(path, stamp):
+    """The saved record, if it was built from the history with this stamp."""
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if stamp is None or saved.get("stamp") != json.loads(json.dumps(stamp)):
+        return None
+    return saved["record"]
+
+
+def save(path, record, stamp):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"stamp": stamp, "record": record}, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,269 @@
+import csv
+import datetime
+import gzip
+import hashlib
+import json
+import os
+from modules import storage, writer
+
+# --- BACKUP SYNC ---
+# Copies a player's data files to a mirror folder (a NAS share, a USB
+# disk...) as numbered change sets, so a backup costs what changed since
+# the last one rather than the whole history:
+#   history  days added, changed or removed (one hash per row)
+#   reps     rows appended to each month file since the last sync
+#   config   the custom activity file, when it changed
+#
+# The first sync (and every SNAPSHOT_EVERY-th) is a full snapshot. Each
+# change set is gzipped JSON listed in the mirror's index.json with its
+# SHA-256; restore checks the checksums, then replays the newest snapshot
+# and the deltas after it. What was last sent is remembered locally in
+# sync_state.json, next to the data files.
+
+SNAPSHOT_EVERY = 30
+INDEX_FILE = "index.json"
+STATE_FILE = "sync_state.json"
+TAIL_BYTES = 4096  # compared to check that a reps file was only appended to
+
+
+def _row_hash(row):
+    return hashlib.blake2b("\x1f".join(row).encode(), digest_size=8).hexdigest()
+
+
+def _file_hash(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _tail_hash(path, size):
+    with open(path, "rb") as f:
+        f.seek(max(0, size - TAIL_BYTES))
+        return hashlib.sha256(f.read(size - f.tell())).hexdigest()
+
+
+def _file_stamp(path):
+    stamp = storage.file_stamp(path)
+    return None if stamp is None else list(stamp)  # as stored in sync_state.json
+
+
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return default
+
+
+def _write_json(path, value):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(value, f)
+    os.replace(tmp_path, path)
+
+
+# --- CHANGE SETS ---
+def _history_changes(data_file, state, full):
+    """Changed and deleted days since the hashes in `state` (None if untouched)."""
+    stamp = _file_stamp(data_file)
+    if not full and stamp == state.get("stamp"):
+        return None
+    with writer.FileLock(data_file):
+        header, rows = writer.read_rows(data_file)
+    if "Date" not in header:
+        state.update(stamp=stamp, header=header, hashes={})
+        return {"header": header, "rows": [], "deleted": []} if full else None
+    date_col = header.index("Date")
+    old = {} if full else state.get("hashes", {})
+    hashes = {row[date_col]: _row_hash(row) for row in rows}
+    if header == state.get("header"):
+        changed = [row for row in rows if old.get(row[date_col]) != hashes[row[date_col]]]
+    else:
+        changed = rows  # cells moved to other columns: every row is resent
+    # Deleted days are found by Date, so they're caught across a header change too
+    deleted = sorted(set(old) - set(hashes))
+    state.update(stamp=stamp, header=header, hashes=hashes)
+    if not changed and not deleted and not full:
+        return None
+    return {"header": header, "rows": changed, "deleted": deleted}
+
+
+def _reps_changes(reps_dir, state, full):
+    """Per month: the rows appended since the last sync, or the whole file if
+    it was rewritten. Only the new bytes of an appended file are read."""
+    changes = {}
+    try:
+        names = sorted(n for n in os.listdir(reps_dir) if n.endswith(".csv") and len(n) == 11)
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        month, path = name[:7], os.path.join(reps_dir, name)
+        seen = None if full else state.get(month)
+        with writer.FileLock(path):
+            size = os.path.getsize(path)
+            if seen is not None and size == seen["size"]:
+                continue
+            appended = seen is not None and size > seen["size"] and _tail_hash(path, seen["size"]) == seen["tail"]
+            with open(path, newline="") as f:
+                if appended:
+                    f.seek(seen["size"])
+                    header, rows = seen["header"], list(csv.reader(f))
+                else:
+                    reader = csv.reader(f)
+                    header, rows = next(reader, []), list(reader)
+        changes[month] = {"header": header, "rows": rows, "append": appended}
+        state[month] = {"size": size, "header": header, "tail": _tail_hash(path, size)}
+    return changes
+
+
+def _config_changes(config_file, state, full):
+    digest = _file_hash(config_file)
+    if digest is None or (not full and digest == state.get("sha256")):
+        return None
+    state["sha256"] = digest
+    header, rows = writer.read_rows(config_file)
+    return {"header": header, "rows": rows}
+
+
+def sync(files, mirror, full=False):
+    """Writes one change set for `files` (data_file, reps_dir, config_file) to
+    `mirror`. Returns its index entry, or None if nothing changed."""
+    os.makedirs(mirror, exist_ok=True)
+    index = _read_json(os.path.join(mirror, INDEX_FILE), [])
+    state_path = os.path.join(os.path.dirname(os.path.abspath(files["data_file"])), STATE_FILE)
+    state = _read_json(state_path, {})
+    last_seq = index[-1]["seq"] if index else 0
+    # Deltas are only valid on top of what this mirror already holds
+    if state.get("mirror") != os.path.abspath(mirror) or state.get("seq") != last_seq:
+        state = {}
+    since_snapshot = last_seq - max((e["seq"] for e in index if e["full"]), default=last_seq)
+    full = full or not state or since_snapshot + 1 >= SNAPSHOT_EVERY
+
+    history = _history_changes(files["data_file"], state.setdefault("history", {}), full)
+    reps = _reps_changes(files["reps_dir"], state.setdefault("reps", {}), full)
+    config = _config_changes(files["config_file"], state.setdefault("config", {}), full)
+    if not full and history is None and not reps and config is None:
+        return None
+
+    seq = last_seq + 1
+    change_set = {"seq": seq, "full": full, "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                  "history": history, "reps": reps, "config": config}
+    data = gzip.compress(json.dumps(change_set, separators=(",", ":")).encode())
+    name = f"{seq:06d}-{'snapshot' if full else 'delta'}.json.gz"
+    with open(os.path.join(mirror, name) + ".tmp", "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(os.path.join(mirror, name) + ".tmp", os.path.join(mirror, name))
+    entry = {"seq": seq, "full": full, "file": name, "bytes": len(data),
+             "sha256": hashlib.sha256(data).hexdigest(), "created": change_set["created"]}
+    _write_json(os.path.join(mirror, INDEX_FILE), index + [entry])
+    state.update(mirror=os.path.abspath(mirror), seq=seq)
+    _write_json(state_path, state)
+    return entry
+
+
+# --- RESTORE ---
+def _load_change_set(mirror, entry):
+    with open(os.path.join(mirror, entry["file"]), "rb") as f:
+        data = f.read()
+    if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+        raise ValueError(f"Checksum mismatch in {entry['file']}: the backup is damaged")
+    return json.loads(gzip.decompress(data))
+
+
+def _restore_file(path, content):
+    """Writes (header, rows) to `path`, or removes it if `content` is empty."""
+    with writer.FileLock(path):
+        if content:
+            writer.atomic_write_rows(*content, path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def restore(mirror, files, seq=None):
+    """Rebuilds the data files as of change set `seq` (default: the newest)
+    from the newest snapshot at or before it plus the deltas after that.
+    Returns the seq restored."""
+    index = [e for e in _read_json(os.path.join(mirror, INDEX_FILE), []) if seq is None or e["seq"] <= seq]
+    base = max((i for i, e in enumerate(index) if e["full"]), default=None)
+    if base is None:
+        raise ValueError(f"No snapshot in {mirror} to restore from")
+
+    history_header, days, months, config = [], {}, {}, None
+    for entry in index[base:]:
+        change_set = _load_change_set(mirror, entry)
+        if change_set["history"] is not None:
+            h = change_set["history"]
+            history_header = h["header"] + [c for c in history_header if c not in h["header"]]
+            date_col = h["header"].index("Date") if "Date" in h["header"] else None
+            for row in h["rows"]:
+                days[row[date_col]] = dict(zip(h["header"], row))
+            for date_str in h["deleted"]:
+                days.pop(date_str, None)
+        for month, r in change_set["reps"].items():
+            if r["append"] and month in months:
+                months[month]["rows"].extend(r["rows"])
+            else:
+                months[month] = {"header": r["header"], "rows": list(r["rows"])}
+        if change_set["config"] is not None:
+            config = change_set["config"]
+
+    # Every file is written under the lock the app's writers take. A snapshot
+    # without history or config means the files didn't exist then: remove them.
+    rows = [[day.get(c, "") for c in history_header] for _, day in sorted(days.items())]
+    _restore_file(files["data_file"], history_header and (history_header, rows))
+    os.makedirs(files["reps_dir"], exist_ok=True)
+    for month, r in months.items():
+        _restore_file(os.path.join(files["reps_dir"], month + ".csv"), (r["header"], r["rows"]))
+    # Months logged after the restored change set would mix two states
+    for name in os.listdir(files["reps_dir"]):
+        if name.endswith(".csv") and len(name) == 11 and name[:7] not in months:
+            _restore_file(os.path.join(files["reps_dir"], name), None)
+    _restore_file(files["config_file"], config and (config["header"], config["rows"]))
+    # The restored files differ from what was last sent: start over with a snapshot
+    state_path = os.path.join(os.path.dirname(os.path.abspath(files["data_file"])), STATE_FILE)
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    return index[-1]["seq"]
+
+
+def verify(mirror):
+    """Checks every change set against its checksum. Returns the damaged file names."""
+    damaged = []
+    for entry in _read_json(os.path.join(mirror, INDEX_FILE), []):
+        try:
+            _load_change_set(mirror, entry)
+        except (OSError, ValueError):
+            damaged.append(entry["file"])
+    return damaged
+
+
+if __name__ == "__main__":
+    # Scheduled backups: python -m modules.sync [--user NAME] [--full | --restore [SEQ] | --verify]
+    import argparse
+    from modules import data_manager
+    parser = argparse.ArgumentParser(description="Back up (or restore) a player's data to the mirror folder.")
+    parser.add_argument("--user", help="player name (default: the shared data)")
+    parser.add_argument("--mirror", help=f"mirror folder (default: {data_manager.MIRROR_DIR}/<player>)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--full", action="store_true", help="write a full snapshot")
+    group.add_argument("--restore", nargs="?", type=int, const=0, metavar="SEQ",
+                       help="restore the newest backup, or change set SEQ")
+    group.add_argument("--verify", action="store_true", help="check every change set's checksum")
+    args = parser.parse_args()
+    try:
+        data_manager.existing_user(args.user)
+    except ValueError as e:
+        parser.error(str(e))
+    with data_manager.as_user(args.user):
+        mirror = args.mirror or data_manager.mirror_dir()
+        if args.verify:
+            damaged = verify(mirror)
+            print(f"{len(damaged)} damaged change set(s)" + (": " + ", ".join(damaged) if damaged else ""))
+        elif args.restore is not None:
+            print(f"Restored change set {data_manager.restore_backup(mirror, args.restore or None)}")
+        else:
+            entry = data_manager.backup(mirror, args.full)
+            print("Nothing changed" if entry is None else f"Wrote {entry['file']} ({entry['bytes']} bytes)")
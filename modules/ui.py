@@ -9,6 +9,20 @@ def apply_styling():
     </style>
     """, unsafe_allow_html=True)
 
+def show_profiler_panel(report, reruns_per_min, cache_stats):
+    """Developer Mode sidebar panel with the last rerun's timings and I/O."""
+    with st.sidebar.expander("⏱️ Profiler", expanded=True):
+        c1, c2 = st.columns(2)
+        c1.metric("Rerun", f"{report['total_ms']:.0f} ms")
+        c2.metric("Reruns/min", reruns_per_min)
+        st.caption("Tabs")
+        st.table({name: f"{ms:.1f} ms" for name, ms in report['sections_ms'].items()})
+        st.caption("data_manager calls")
+        st.table({name: f"{c['count']}× · {c['ms']:.1f} ms" for name, c in report['calls'].items()})
+        st.caption(f"CSV reads: {report['csv_reads']} ({report['csv_read_bytes'] / 1024:.1f} KB) · "
+                   f"writes: {report['csv_writes']} ({report['csv_write_bytes'] / 1024:.1f} KB)")
+        st.caption(f"History cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+
 def show_rainbow_border():
     """Injects a temporary rainbow border animation."""
     st.markdown("""
@@ -1,10 +1,13 @@
 import streamlit as st
+import math
 import time
-from modules import data_manager, ui
+from collections import namedtuple
+from modules import data_manager, media, ui
 
 # --- EXERCISE DATABASE (Images & Tips) ---
 # I have updated these to more reliable sources.
 # If a GIF doesn't load, the text instructions are now detailed enough to guide you.
+# GIFs are served from the local media cache (modules/media.py) once cached.
 EXERCISE_DB = {
     "Goblet Squats": {
         "img": "https://media.tenor.com/2Xy5u8s_VlAAAAAC/goblet-squat.gif",
@@ -112,14 +115,94 @@ SIDE_QUESTS = {
     ]
 }
 
+# --- SESSION PLANNER ---
+# A workout is planned once, when it starts: duration, target reps and
+# EXERCISE_DB details for every exercise in the queue, with all targets
+# resolved in one pass. The plan is an immutable tuple kept in session
+# state, so the screens and the countdown never touch data_manager.
+PlannedExercise = namedtuple("PlannedExercise", ["name", "duration", "target", "img", "targets", "tips"])
+NO_INFO = {"img": None, "targets": "General", "tips": "No tips available."}
+
+def plan_session(queue, dev_mode=False):
+    targets = data_manager.get_targets(ex['name'] for ex in queue)
+    plan = []
+    for ex in queue:
+        info = EXERCISE_DB.get(ex['name'], NO_INFO)
+        plan.append(PlannedExercise(ex['name'], 1 if dev_mode else ex['time'], targets[ex['name']],
+                                    info.get('img'), info['targets'], info['tips']))
+    return tuple(plan)
+
+def _start_workout(queue, dev_mode):
+    st.session_state['wo_plan'] = plan_session(queue, dev_mode)
+    st.session_state['wo_index'] = 0
+    st.session_state['wo_active'] = True
+    st.session_state['wo_stage'] = 'ready'
+
+# --- TIMER (Deadline Based) ---
+# The timer stores an absolute deadline instead of a counter that is
+# decremented once per rerun. Only the small countdown fragment refreshes
+# every second; the rest of the app reruns on stage changes and clicks.
+
+def _start_timer(seconds):
+    st.session_state['timer_deadline'] = time.time() + seconds
+    st.session_state['timer_remaining'] = seconds
+    st.session_state['timer_running'] = True
+
+def _time_left():
+    if st.session_state['timer_running']:
+        return max(0, math.ceil(st.session_state['timer_deadline'] - time.time()))
+    return st.session_state['timer_remaining']
+
+def _pause_timer():
+    if st.session_state['timer_running']:
+        st.session_state['timer_remaining'] = _time_left()
+        st.session_state['timer_running'] = False
+
+def _resume_timer():
+    if not st.session_state['timer_running']:
+        _start_timer(st.session_state['timer_remaining'])
+
+def _add_time(seconds):
+    if st.session_state['timer_running']:
+        st.session_state['timer_deadline'] += seconds
+    else:
+        st.session_state['timer_remaining'] += seconds
+
+def _stop_timer():
+    st.session_state['timer_running'] = False
+    st.session_state['timer_remaining'] = 0
+
+@st.fragment(run_every=1)
+def _countdown(label, on_expire):
+    """Re-renders only the timer each second; reruns the app once it hits zero."""
+    left = _time_left()
+    st.metric(label=label, value=f"{left} s")
+    if left <= 0:
+        _stop_timer()
+        on_expire()
+        st.rerun()
+
+def _end_exercise():
+    st.session_state['wo_stage'] = 'feedback'
+
+def _end_rest():
+    st.session_state['wo_index'] += 1
+    st.session_state['wo_stage'] = 'ready'
+
+def _quit_workout():
+    # Keep the sets done so far
+    data_manager.flush_sets()
+    st.session_state['wo_stage'] = 'prep'
+
 def render_workout_tab(dev_mode):
     # Initialize State
     if 'wo_active' not in st.session_state:
         st.session_state['wo_active'] = False
         st.session_state['wo_stage'] = 'prep' 
-        st.session_state['wo_queue'] = []
+        st.session_state['wo_plan'] = ()
         st.session_state['wo_index'] = 0
-        st.session_state['timer_val'] = 0
+        st.session_state['timer_deadline'] = 0.0
+        st.session_state['timer_remaining'] = 0
         st.session_state['timer_running'] = False
         st.session_state['reps_log'] = {}
 
@@ -131,10 +214,7 @@ def render_workout_tab(dev_mode):
         with col1:
             st.info("⏱️ **Base Routine (12m)**\n\nFull Body Activation")
             if st.button("🚀 START BASE WORKOUT", use_container_width=True, type="primary"):
-                st.session_state['wo_queue'] = BASE_ROUTINE + BASE_ROUTINE # 2 Sets
-                st.session_state['wo_index'] = 0
-                st.session_state['wo_active'] = True
-                st.session_state['wo_stage'] = 'ready'
+                _start_workout(BASE_ROUTINE + BASE_ROUTINE, dev_mode) # 2 Sets
                 st.session_state['reps_log'] = {}
                 st.rerun()
                 
@@ -142,54 +222,49 @@ def render_workout_tab(dev_mode):
             st.warning("⚔️ **Side Quests (5m)**\n\nAdd-on Finishers")
             quest_name = st.selectbox("Select Quest:", list(SIDE_QUESTS.keys()))
             if st.button(f"Start {quest_name}", use_container_width=True):
-                st.session_state['wo_queue'] = SIDE_QUESTS[quest_name]
-                st.session_state['wo_index'] = 0
-                st.session_state['wo_active'] = True
-                st.session_state['wo_stage'] = 'ready'
+                _start_workout(SIDE_QUESTS[quest_name], dev_mode)
                 st.rerun()
 
     # --- HELPER: GET DATA ---
     if st.session_state['wo_active'] and st.session_state['wo_stage'] != 'summary':
-        if st.session_state['wo_index'] >= len(st.session_state['wo_queue']):
+        if st.session_state['wo_index'] >= len(st.session_state['wo_plan']):
+            # Sets were journaled one by one; store them in a single write
+            data_manager.flush_sets()
             st.session_state['wo_stage'] = 'summary'
             st.rerun()
             
-        current_ex = st.session_state['wo_queue'][st.session_state['wo_index']]
-        name = current_ex['name']
-        duration = 1 if dev_mode else current_ex['time']
-        
-        # Get DB Info safely
-        db_info = EXERCISE_DB.get(name, {"img": None, "targets": "General", "tips": "No tips available."})
-        target_reps = data_manager.get_target_reps(name)
+        # Everything below comes from the plan: no data access per rerun
+        current_ex = st.session_state['wo_plan'][st.session_state['wo_index']]
+        name = current_ex.name
+        target_reps = current_ex.target
 
     # --- SCREEN 2: GET READY ---
     if st.session_state['wo_stage'] == 'ready':
-        st.progress(st.session_state['wo_index'] / len(st.session_state['wo_queue']))
-        st.caption(f"Up Next: {st.session_state['wo_index'] + 1} / {len(st.session_state['wo_queue'])}")
+        st.progress(st.session_state['wo_index'] / len(st.session_state['wo_plan']))
+        st.caption(f"Up Next: {st.session_state['wo_index'] + 1} / {len(st.session_state['wo_plan'])}")
         
         st.markdown(f"### 👉 Get Ready: **{name}**")
         
         col_img, col_info = st.columns([1, 1])
         with col_img:
-            if db_info.get("img"):
-                st.image(db_info['img'], use_column_width=True)
+            if current_ex.img:
+                st.image(media.image(current_ex.img), width="stretch")
             else:
                 st.warning("No GIF available")
         
         with col_info:
             st.info(f"🎯 **Target Reps:** {target_reps}")
-            st.markdown(f"**Muscles:** {db_info['targets']}")
-            st.markdown(f"**How to:**\n{db_info['tips']}")
+            st.markdown(f"**Muscles:** {current_ex.targets}")
+            st.markdown(f"**How to:**\n{current_ex.tips}")
 
         st.divider()
         c1, c2 = st.columns([3, 1])
         if c1.button("🔥 START EXERCISE", type="primary", use_container_width=True):
-            st.session_state['timer_val'] = duration
-            st.session_state['timer_running'] = True
+            _start_timer(current_ex.duration)
             st.session_state['wo_stage'] = 'active'
             st.rerun()
         if c2.button("❌ Quit"):
-            st.session_state['wo_stage'] = 'prep'
+            _quit_workout()
             st.rerun()
 
     # --- SCREEN 3: ACTIVE ---
@@ -199,35 +274,25 @@ def render_workout_tab(dev_mode):
         # Timer
         t_col1, t_col2 = st.columns([2,1])
         with t_col1:
-            st.metric(label="Time Remaining", value=f"{st.session_state['timer_val']} s")
+            _countdown("Time Remaining", _end_exercise)
         with t_col2:
-            if db_info.get("img"): st.image(db_info['img'], width=100)
+            if current_ex.img: st.image(media.thumbnail(current_ex.img), width=media.THUMB_WIDTH)
             
-        st.markdown(f"**Focus:**\n{db_info['tips']}")
+        st.markdown(f"**Focus:**\n{current_ex.tips}")
 
         # Controls
         c1, c2, c3, c4 = st.columns(4)
         if c1.button("⏸️ Pause"):
-            st.session_state['timer_running'] = False
+            _pause_timer()
             st.rerun()
         if c2.button("▶️ Resume"):
-            st.session_state['timer_running'] = True
+            _resume_timer()
             st.rerun()
         if c3.button("⏭️ Done"):
-            st.session_state['timer_val'] = 0
+            _stop_timer()
             st.rerun()
         if c4.button("❌ Quit"):
-            st.session_state['wo_stage'] = 'prep'
-            st.rerun()
-
-        # Timer Logic
-        if st.session_state['timer_running'] and st.session_state['timer_val'] > 0:
-            time.sleep(1)
-            st.session_state['timer_val'] -= 1
-            st.rerun()
-        
-        if st.session_state['timer_val'] <= 0:
-            st.session_state['wo_stage'] = 'feedback'
+            _quit_workout()
             st.rerun()
 
     # --- SCREEN 4: FEEDBACK ---
@@ -245,11 +310,10 @@ def render_workout_tab(dev_mode):
         reps = st.number_input(f"Reps completed (Target: {target_reps})", min_value=0, value=default_val)
         
         if st.button("Confirm & Rest", type="primary"):
-            data_manager.save_reps(name, reps)
+            data_manager.log_set(name, reps)
             st.session_state['reps_log'][name] = st.session_state['reps_log'].get(name, 0) + reps
             
-            st.session_state['timer_val'] = 30
-            st.session_state['timer_running'] = True
+            _start_timer(30)
             st.session_state['wo_stage'] = 'rest'
             st.rerun()
 
@@ -259,34 +323,26 @@ def render_workout_tab(dev_mode):
         
         # Up Next Preview
         next_idx = st.session_state['wo_index'] + 1
-        if next_idx < len(st.session_state['wo_queue']):
-            next_ex = st.session_state['wo_queue'][next_idx]['name']
-            st.info(f"Up Next: **{next_ex}**")
+        if next_idx < len(st.session_state['wo_plan']):
+            next_ex = st.session_state['wo_plan'][next_idx]
+            st.info(f"Up Next: **{next_ex.name}**")
+            # Cache the next GIF while resting, so the ready screen shows it instantly
+            media.prefetch(next_ex.img)
         else:
             st.balloons()
             st.success("Up Next: **FINISH LINE!** 🏁")
 
-        st.metric("Rest Timer", f"{st.session_state['timer_val']} s")
+        _countdown("Rest Timer", _end_rest)
         
         c1, c2, c3 = st.columns(3)
         if c1.button("➕ Add 30s"):
-            st.session_state['timer_val'] += 30
+            _add_time(30)
             st.rerun()
         if c2.button("⏭️ Skip Rest"):
-            st.session_state['timer_val'] = 0
+            _stop_timer()
             st.rerun()
         if c3.button("❌ Quit"):
-            st.session_state['wo_stage'] = 'prep'
-            st.rerun()
-
-        if st.session_state['timer_running'] and st.session_state['timer_val'] > 0:
-            time.sleep(1)
-            st.session_state['timer_val'] -= 1
-            st.rerun()
-            
-        if st.session_state['timer_val'] <= 0:
-            st.session_state['wo_index'] += 1
-            st.session_state['wo_stage'] = 'ready'
+            _quit_workout()
             st.rerun()
 
     # --- SCREEN 6: SUMMARY ---
@@ -311,8 +367,6 @@ def render_workout_tab(dev_mode):
              st.markdown("**Want more?**")
              quest = st.selectbox("Pick an Extra:", list(SIDE_QUESTS.keys()), key="summary_select")
              if st.button(f"Start {quest}"):
-                 st.session_state['wo_queue'] = SIDE_QUESTS[quest]
-                 st.session_state['wo_index'] = 0
-                 st.session_state['wo_stage'] = 'ready'
+                 _start_workout(SIDE_QUESTS[quest], dev_mode)
                  st.rerun()
         
@@ -0,0 +1,292 @@
+import csv
+import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import Future
+from modules import profiler
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+# --- WRITE COORDINATOR ---
+# All CSV writes go through one background thread. Saves queued at the same
+# time (several tabs or devices) are merged into a single read-modify-write
+# per file, done under an advisory lock and committed with an atomic
+# os.replace, so readers never see a half-written file.
+
+
+class FileLock:
+    """Advisory lock on `<path>.lock`, shared with other processes using the same data."""
+
+    _thread_locks = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.lock_path = path + ".lock"
+        with FileLock._registry_lock:
+            self._thread_lock = FileLock._thread_locks.setdefault(self.lock_path, threading.Lock())
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+
+def _cell(value):
+    """Python value -> CSV text, with None/NaN as an empty cell (like pandas)."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value)
+
+
+def read_rows(path):
+    """Header and raw string rows of a CSV file (no pandas needed)."""
+    if not os.path.exists(path):
+        return [], []
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        return next(reader, []), list(reader)
+
+
+def read_header(path):
+    """Just the column names of a CSV file ([] if it doesn't exist)."""
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as f:
+        return next(csv.reader(f), [])
+
+
+# Read once: mkstemp creates files as 0600, which would hide the data from
+# other users (or a backup job) on a shared folder
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path):
+    """The mode a rewrite of `path` keeps: its current one, or 0666 minus the umask."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _atomic_write(path, write):
+    """Writes to a temp file in the same folder, fsyncs, then swaps it in."""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".csv", dir=folder)
+    try:
+        os.chmod(tmp_path, _file_mode(path))
+        with os.fdopen(fd, "w", newline="") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_csv(df, path):
+    return _atomic_write(path, lambda f: df.to_csv(f, index=False))
+
+
+def atomic_write_rows(header, rows, path):
+    def write(f):
+        out = csv.writer(f, lineterminator="\n")
+        out.writerow(header)
+        width = len(header)
+        for row in rows:
+            out.writerow(row + [""] * (width - len(row)) if len(row) < width else row)
+    return _atomic_write(path, write)
+
+
+def append_rows(header, rows, path):
+    """Appends rows (with a header if the file is new), fsyncs and returns the bytes added."""
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", newline="") as f:
+        start = f.tell()
+        out = csv.writer(f, lineterminator="\n")
+        if write_header:
+            out.writerow(header)
+        out.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell() - start
+
+
+def _apply_row_jobs(header, rows, jobs):
+    """Applies upserts/appends (dict rows) to raw CSV rows in place."""
+    header = list(header)
+    key_pos = {}
+    for kind, _, payload in jobs:
+        if kind == "upsert":
+            key, row_dicts = payload[0], [payload[1]]
+        else:
+            key, row_dicts = None, payload
+        for row in row_dicts:
+            for col in row:
+                if col not in header:
+                    header.append(col)
+            cells = [""] * len(header)
+            for col, value in row.items():
+                cells[header.index(col)] = _cell(value)
+            if key is None:
+                rows.append(cells)
+                continue
+            if key not in key_pos:
+                col = header.index(key)
+                key_pos[key] = (col, {r[col]: i for i, r in enumerate(rows) if len(r) > col})
+            col, positions = key_pos[key]
+            i = positions.get(cells[col])
+            if i is None:
+                positions[cells[col]] = len(rows)
+                rows.append(cells)
+            else:
+                rows[i] = cells
+    return header, rows
+
+
+class WriteCoordinator:
+    """Single writer thread that batches queued CSV writes per file.
+
+    Callers block on the returned future, so a save still returns only once
+    its data is on disk; concurrent saves simply share one commit. Row-level
+    writes use the csv module, so saving a day doesn't need pandas.
+    """
+
+    def __init__(self, max_batch=256):
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.commits = 0
+        self.jobs = 0
+
+    def _ensure_started(self):
+        # Called with _start_lock held
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="life-rpg-writer", daemon=True)
+            self._thread.start()
+
+    def _submit(self, job):
+        """Queues a job and waits for its commit. Returns the bytes written, which
+        are charged to the first job of a shared commit (the others get 0)."""
+        future = Future()
+        with self._start_lock:
+            self._ensure_started()
+            self._queue.put((job, future))
+        nbytes = future.result()
+        profiler.count_write(nbytes)
+        return nbytes
+
+    # --- Public API (blocking) ---
+    def upsert(self, path, key, row):
+        """Replaces the row whose `key` column equals row[key], or adds it."""
+        return self._submit(("upsert", path, (key, row)))
+
+    def append(self, path, rows):
+        return self._submit(("append", path, rows))
+
+    def replace(self, path, df):
+        return self._submit(("replace", path, df))
+
+    def replace_rows(self, path, header, rows):
+        """Like replace, from a header and lists of cells (no pandas needed)."""
+        return self._submit(("replace", path, (header, rows)))
+
+    def close(self):
+        """Stops the writer thread once the jobs already queued are written.
+        A later write starts it again."""
+        self._queue.put(None)
+
+    # --- Writer thread ---
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                with self._start_lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue  # jobs queued after close(): keep writing
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # handled once this batch is written
+                    break
+                batch.append(item)
+            by_path = {}
+            for job, future in batch:
+                by_path.setdefault(job[1], []).append((job, future))
+            for path, jobs in by_path.items():
+                try:
+                    nbytes = self._commit(path, [job for job, _ in jobs])
+                except Exception as e:
+                    for _, future in jobs:
+                        future.set_exception(e)
+                else:
+                    for i, (_, future) in enumerate(jobs):
+                        future.set_result(nbytes if i == 0 else 0)
+
+    def _commit(self, path, jobs):
+        self.jobs += len(jobs)
+        self.commits += 1
+        nbytes = 0
+        with FileLock(path):
+            # A full replace resets the file; row jobs around it are grouped
+            # so each group is one read and one write.
+            group = []
+            for job in jobs + [None]:
+                if job is not None and job[0] != "replace":
+                    group.append(job)
+                    continue
+                if group:
+                    nbytes += self._commit_rows(path, group)
+                    group = []
+                if job is not None and isinstance(job[2], tuple):
+                    nbytes += atomic_write_rows(*job[2], path)
+                elif job is not None:
+                    nbytes += atomic_write_csv(job[2], path)
+        return nbytes
+
+    def _commit_rows(self, path, jobs):
+        if all(kind == "append" for kind, _, _ in jobs):
+            new_rows = [row for _, _, rows in jobs for row in rows]
+            header = read_header(path) or list(new_rows[0])
+            if all(set(row) <= set(header) for row in new_rows):
+                return append_rows(header, [[_cell(row.get(c)) for c in header] for row in new_rows], path)
+        header, rows = read_rows(path)
+        header, rows = _apply_row_jobs(header, rows, jobs)
+        return atomic_write_rows(header, rows, path)
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_coordinator():
+    """The process-wide write coordinator."""
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None:
+            _coordinator = WriteCoordinator()
+        return _coordinator
@@ -0,0 +1,44 @@
+import datetime
+import io
+import pytest
+from modules import columnar, data_manager
+
+DAY = {"Points": 40, "Steps": 6000, "Sleep_Hours": 8.0, "Wake_Mood": "Normal", "Workout_Done": False,
+       "Food_Bonus": 0, "Study_Mins": 0, "Custom_Notes": "", "Custom_Activities": "[]", "Custom_Mask": 0}
+
+# A partial tracker export: 2026-10-10 has no sleep and no steps, 2026-10-11 has both
+EXPORT = """date,steps,sleep_h
+2026-10-10 08:00,,
+2026-10-10 20:00,,
+2026-10-11 08:00,3000,7.5
+2026-10-11 20:00,2000,
+"""
+FIELDS = {"Steps": ("steps", "sum"), "Sleep_Hours": ("sleep_h", "max")}
+
+
+@pytest.fixture
+def data_folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_manager.reset_caches()
+    yield tmp_path
+    data_manager.reset_caches()
+
+
+def test_daily_totals_skips_days_without_values():
+    days = columnar.daily_totals(io.StringIO(EXPORT), "date", FIELDS)
+    assert days == {"2026-10-11": {"Steps": 5000, "Sleep_Hours": 7.5}}
+
+
+def test_partial_import_keeps_existing_values(data_folder):
+    for day in (10, 11):
+        data_manager.save_day(datetime.date(2026, 10, day), dict(DAY))
+
+    touched = data_manager.import_tracker_export(io.StringIO(EXPORT), "date", FIELDS)
+
+    assert touched == 1
+    untouched = data_manager.get_day_data(datetime.date(2026, 10, 10))
+    assert untouched["Sleep_Hours"] == 8.0
+    assert untouched["Steps"] == 6000
+    imported = data_manager.get_day_data(datetime.date(2026, 10, 11))
+    assert imported["Sleep_Hours"] == 7.5
+    assert imported["Steps"] == 5000
@@ -0,0 +1,29 @@
+import datetime
+import io
+import os
+import pytest
+from streamlit.testing.v1 import AppTest
+from modules import data_manager
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture
+def data_folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LIFE_RPG_MEDIA_FETCH", "0")
+    data_manager.reset_caches()
+    yield tmp_path
+    data_manager.reset_caches()
+
+
+def test_daily_log_renders_a_steps_only_imported_day(data_folder):
+    today = datetime.date.today().isoformat()
+    export = io.StringIO(f"date,steps\n{today} 09:00,4000\n{today} 18:00,2500\n")
+    assert data_manager.import_tracker_export(export, "date", {"Steps": ("steps", "sum")}) == 1
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+
+    assert not at.exception
+    assert at.slider(key=f"log::{today}:Sleep_Hours").value == 7.5
+    assert at.number_input(key=f"log::{today}:Steps").value == 6500
@@ -0,0 +1,30 @@
+import datetime
+import io
+import pytest
+from modules import data_manager, report
+
+
+@pytest.fixture
+def data_folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_manager.reset_caches()
+    yield tmp_path
+    data_manager.reset_caches()
+
+
+def test_days_by_day_is_oldest_first(data_folder):
+    # Saved out of order, as a back-filled CSV history is stored
+    for day in (5, 1, 3):
+        data_manager.save_day(datetime.date(2026, 10, day), {"Points": day, "Steps": 0})
+
+    out = io.StringIO()
+    rows = report.days_report(datetime.date(2026, 10, 1), datetime.date(2026, 10, 31), "day", ["Points"])
+    report.write(rows, out)
+
+    assert out.getvalue().splitlines()[1:] == ["2026-10-01,1", "2026-10-03,3", "2026-10-05,5"]
+
+
+def test_unknown_user_is_rejected_without_creating_a_folder(data_folder):
+    with pytest.raises(SystemExit):
+        report.main(["days", "--user", "typo"])
+    assert not (data_folder / data_manager.USERS_DIR).exists()
@@ -0,0 +1,45 @@
+import os
+import threading
+from modules import sync, writer
+
+HEADER = ["Date", "Points", "Steps"]
+
+
+def _files(folder):
+    return {"data_file": str(folder / "history.csv"), "reps_dir": str(folder / "reps"),
+            "config_file": str(folder / "config.csv")}
+
+
+def test_restore_snapshot_without_history_or_config_empties_them(tmp_path):
+    mirror = str(tmp_path / "mirror")
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    sync.sync(_files(empty), mirror, full=True)
+
+    live = tmp_path / "live"
+    live.mkdir()
+    files = _files(live)
+    writer.atomic_write_rows(HEADER, [["2026-10-01", "40", "6000"]], files["data_file"])
+    writer.atomic_write_rows(["ID", "Activity", "Points"], [["0", "Read", "10"]], files["config_file"])
+
+    assert sync.restore(mirror, files) == 1
+    assert not os.path.exists(files["data_file"])
+    assert not os.path.exists(files["config_file"])
+
+
+def test_restore_waits_for_the_file_lock(tmp_path):
+    mirror = str(tmp_path / "mirror")
+    files = _files(tmp_path)
+    writer.atomic_write_rows(HEADER, [["2026-10-01", "40", "6000"]], files["data_file"])
+    sync.sync(files, mirror, full=True)
+    writer.atomic_write_rows(HEADER, [["2026-10-02", "50", "7000"]], files["data_file"])
+
+    lock = writer.FileLock(files["data_file"])
+    restored = threading.Event()
+    with lock:
+        thread = threading.Thread(target=lambda: (sync.restore(mirror, files), restored.set()))
+        thread.start()
+        assert not restored.wait(0.2)
+    thread.join(5)
+    assert restored.is_set()
+    assert writer.read_rows(files["data_file"])[1] == [["2026-10-01", "40", "6000"]]